@@ -4,19 +4,10 @@ from functools import reduce
 import math
 import time
 
-from OpenGL.GL import (
-    glViewport, glClear, glEnable, glClearColor
-)
-from OpenGL.GL import (
-    GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT,
-    GL_DEPTH_TEST
-)
-import pygame
 import numpy as np
 
-from . import matrix
-from .ms3d import MS3DModel
-from .bone_model import BoneModel
+from . import destruct, matrix, mesh
+from .ms3d import MS3DModel, MS3DSpec, gltf
 
 Vector = namedtuple('Vector', 'x y z')
 UP = [0, 1, 0]
@@ -27,18 +18,18 @@ def lerp(a, b, t):
 
 
 def model_skeleton_matrices(model):
-    for bone in model.bones.values():
+    # The model's pose was just evaluated to draw it, this reuses it
+    skeleton = model.skeleton
+    positions = skeleton.world_matrices(model.timestamp)[:, :3, 3]
+
+    for index, parent in enumerate(skeleton.parents):
         # Skip bones that don't have a parent bone
-        if not bone.parent_bone:
+        if parent < 0:
             continue
 
         # Calculate the difference between this bone and its parent bone
-        A = np.dot(
-            bone.matrix_at_t(model.timestamp), [0, 0, 0, 1]
-        )[:3]
-        B = np.dot(
-            bone.parent_bone.matrix_at_t(model.timestamp), [0, 0, 0, 1]
-        )[:3]
+        A = positions[index]
+        B = positions[parent]
         delta = A - B
         scale = np.linalg.norm(delta)
 
@@ -60,12 +51,60 @@ def model_skeleton_matrices(model):
         ])
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument('model', metavar='MODEL.MS3D', type=str)
-    parser.add_argument('--show-skeleton', action='store_true')
+def print_info(model_path):
+    """Print the header counts of a model, only decoding what's needed"""
+    with open(model_path, 'rb') as fp:
+        data = MS3DSpec().deserialize_lazy(fp)
 
-    args = parser.parse_args()
+        print('version: {}'.format(data['version']))
+        for name in ('vertices', 'triangles', 'groups', 'materials', 'joints'):
+            print('{}: {}'.format(name, data.sections[name].count))
+        print('animation_fps: {}'.format(data['animation_fps']))
+        print('total_frames: {}'.format(data['total_frames']))
+
+
+def print_report(model_path):
+    """Print the bytes and time it took to decode each part of a model"""
+    report = destruct.Report()
+
+    with open(model_path, 'rb') as fp:
+        MS3DSpec().deserialize(fp, report)
+
+    print(report.format())
+
+
+def export_glb(model_path, glb_path, optimize=False):
+    """Convert a model to binary glTF"""
+    model = MS3DModel(model_path)
+    if optimize:
+        optimize_vertex_cache(model)
+
+    with open(glb_path, 'wb') as fp:
+        gltf.export(model, fp)
+
+
+def optimize_vertex_cache(model):
+    """Reorder the triangles of each group for the vertex cache"""
+    for group in model.groups:
+        before, after = group.optimize_vertex_cache()
+        print('{}: ACMR {:.3f} -> {:.3f}'.format(group.name, before, after))
+
+
+def view(
+    model_path, show_skeleton=False, optimize=False,
+    layout=mesh.FLOAT_LAYOUT, cache=False, bake=False
+):
+    # Only viewing needs OpenGL and pygame, --info and --report don't
+    from OpenGL.GL import (
+        glViewport, glClear, glEnable, glClearColor
+    )
+    from OpenGL.GL import (
+        GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT,
+        GL_DEPTH_TEST
+    )
+    import pygame
+
+    from .bone_model import BoneModel
 
     pygame.init()
     pygame.display.set_mode((800, 600), pygame.DOUBLEBUF | pygame.OPENGL)
@@ -75,7 +114,12 @@ def main():
     glEnable(GL_DEPTH_TEST)
     glClearColor(0, 0, 0, 0)
 
-    model = MS3DModel(args.model)
+    model = MS3DModel(model_path, layout, cache)
+    if optimize:
+        optimize_vertex_cache(model)
+    if bake:
+        model.bake()
+
     bone_model = BoneModel()
     start = time.time()
 
@@ -112,7 +156,7 @@ def main():
         # Draw the model
         model.render(view_matrix, projection_matrix)
 
-        if args.show_skeleton:
+        if show_skeleton:
             glClear(GL_DEPTH_BUFFER_BIT)
             for M in model_skeleton_matrices(model):
                 bone_model.matrix = M
@@ -127,5 +171,54 @@ def main():
                 running = False
 
 
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('model', metavar='MODEL.MS3D', type=str)
+    parser.add_argument('--show-skeleton', action='store_true')
+    parser.add_argument(
+        '--optimize', action='store_true',
+        help='reorder triangles for the vertex cache before drawing'
+    )
+    parser.add_argument(
+        '--compact', action='store_true',
+        help='pack vertices with octahedral normals and 8 bit bone data'
+    )
+    parser.add_argument(
+        '--cache', action='store_true',
+        help='load the model from a preprocessed cache next to it'
+    )
+    parser.add_argument(
+        '--bake', action='store_true',
+        help='play the animation from poses baked at the model\'s frame rate'
+    )
+    parser.add_argument(
+        '--info', action='store_true',
+        help='print the model\'s header counts and exit'
+    )
+    parser.add_argument(
+        '--report', action='store_true',
+        help='print how long each part of the model took to decode and exit'
+    )
+    parser.add_argument(
+        '--glb', metavar='OUTPUT.GLB',
+        help='convert the model to binary glTF and exit'
+    )
+
+    args = parser.parse_args()
+
+    if args.info:
+        print_info(args.model)
+    elif args.report:
+        print_report(args.model)
+    elif args.glb:
+        export_glb(args.model, args.glb, args.optimize)
+    else:
+        view(
+            args.model, args.show_skeleton, args.optimize,
+            mesh.compact_layout() if args.compact else mesh.FLOAT_LAYOUT,
+            args.cache, args.bake
+        )
+
+
 if __name__ == '__main__':
     main()
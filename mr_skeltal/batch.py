@@ -0,0 +1,294 @@
+"""Headless batch processing of models
+
+Models are fanned out to a pool of processes. Each one is loaded (and
+optionally cached) without a GL context, and summarized into a result. The
+arrays requested from each model come back through shared memory instead
+of being pickled.
+"""
+import argparse
+from collections import namedtuple
+import concurrent.futures
+import json
+import os
+import sys
+
+import numpy as np
+
+from . import mesh
+from .ms3d import MS3DModel
+
+
+#: An array in a shared memory block
+SharedArray = namedtuple('SharedArray', ['name', 'dtype', 'shape'])
+
+#: The model arrays that can be requested
+ARRAYS = (
+    'positions', 'bone_weights', 'bone_ids',
+    'triangle_indices', 'normals', 'texcoords'
+)
+
+
+def shared_memory():
+    """The `multiprocessing.shared_memory` module, imported once arrays are
+    requested as it's only available from Python 3.8
+    """
+    try:
+        from multiprocessing import resource_tracker, shared_memory
+    except ImportError:
+        raise RuntimeError(
+            'returning arrays needs multiprocessing.shared_memory, from '
+            'Python 3.8'
+        ) from None
+
+    # Processes share the resource tracker of the process that started them,
+    # which keeps track of every block until it's unlinked
+    resource_tracker.ensure_running()
+
+    return shared_memory
+
+
+def share(array):
+    """Copy an array into a new shared memory block, which is owned by the
+    process that `receive`s it.
+    """
+    array = np.ascontiguousarray(array)
+    block = shared_memory().SharedMemory(
+        create=True, size=max(array.nbytes, 1)
+    )
+
+    try:
+        np.ndarray(array.shape, array.dtype, block.buf)[...] = array
+    finally:
+        block.close()
+
+    return SharedArray(block.name, array.dtype.str, array.shape)
+
+
+def receive(shared):
+    """Copy an array out of its shared memory block, and free the block"""
+    block = shared_memory().SharedMemory(name=shared.name)
+
+    try:
+        return np.ndarray(shared.shape, shared.dtype, block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def discard(shared):
+    """Free the block of a shared array that won't be received"""
+    try:
+        block = shared_memory().SharedMemory(name=shared.name)
+    except FileNotFoundError:
+        return
+
+    block.close()
+    block.unlink()
+
+
+def share_arrays(model, names):
+    """Share the named arrays of a model, freeing the blocks already shared
+    when one of them fails
+    """
+    shared = {}
+
+    try:
+        for name in names:
+            shared[name] = share(getattr(model, name))
+    except Exception:
+        for array in shared.values():
+            discard(array)
+        raise
+
+    return shared
+
+
+def summarize(model):
+    return {
+        'vertices': len(model.positions),
+        'triangles': len(model.triangle_indices),
+        'groups': len(model.groups),
+        'bones': len(model.bones),
+        'bbox': [[float(value) for value in corner] for corner in model.bbox],
+        'animation_length': float(model.animation_length),
+    }
+
+
+def process(path, cache=False, compact=False, arrays=()):
+    """Load a model, runs in the worker processes
+
+    :param path: The path of the model
+    :param cache: Load the model from its cache, or create one
+    :param compact: Use `mesh.compact_layout` for the group buffers
+    :param arrays: The names of the model arrays to return
+    :returns: A result dict, with an `error` instead of the summary when the
+        model couldn't be loaded
+    """
+    layout = mesh.compact_layout() if compact else mesh.FLOAT_LAYOUT
+
+    try:
+        model = MS3DModel(path, layout, cache)
+        result = summarize(model)
+        result['arrays'] = share_arrays(model, arrays)
+    except Exception as e:
+        return {'path': path, 'error': '{}: {}'.format(type(e).__name__, e)}
+
+    result['path'] = path
+    return result
+
+
+def collect(future, path):
+    """The result of a finished `process`, with its arrays received"""
+    try:
+        result = future.result()
+    except Exception as e:
+        # The worker itself died
+        result = {'path': path, 'error': '{}: {}'.format(type(e).__name__, e)}
+
+    result['arrays'] = {
+        name: receive(shared)
+        for name, shared in result.get('arrays', {}).items()
+    }
+
+    return result
+
+
+def drain(futures):
+    """Cancel the futures, waiting for those already running to free the
+    arrays they shared
+    """
+    for future in futures:
+        future.cancel()
+
+    for future in futures:
+        if future.cancelled() or future.exception() is not None:
+            continue
+
+        for shared in future.result().get('arrays', {}).values():
+            discard(shared)
+
+
+def run(paths, jobs=None, cache=False, compact=False, arrays=()):
+    """Process models on a pool of `jobs` processes, see `process`
+
+    When the iteration stops early, the shared arrays of the models that
+    were not yielded are freed.
+
+    :returns: An iterator over the results as they finish, with the
+        requested arrays received from shared memory
+    """
+    if arrays:
+        # Start the resource tracker before the workers, so they share it
+        shared_memory()
+
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        pending = {
+            executor.submit(process, path, cache, compact, arrays): path
+            for path in paths
+        }
+
+        try:
+            for future in concurrent.futures.as_completed(list(pending)):
+                result = collect(future, pending[future])
+                del pending[future]
+                yield result
+        finally:
+            drain(pending)
+
+
+def output_names(paths):
+    """The name of each model's result: its path relative to the directory
+    holding all the models, so models with the same file name in different
+    directories don't overwrite each other's results
+    """
+    directories = [
+        os.path.dirname(os.path.abspath(path)).split(os.sep) for path in paths
+    ]
+    root = os.sep.join(os.path.commonprefix(directories)) or os.sep
+
+    return {
+        path: os.path.relpath(os.path.abspath(path), root) for path in paths
+    }
+
+
+def write_result(output, name, result):
+    """Write a result as JSON, and its arrays as .npz, as `name` in `output`
+    """
+    name = os.path.join(output, name)
+    os.makedirs(os.path.dirname(name), exist_ok=True)
+    arrays = result.pop('arrays')
+
+    with open(name + '.json', 'w') as fp:
+        json.dump(result, fp, indent=2)
+
+    if arrays:
+        np.savez(name + '.npz', **arrays)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Load models in parallel without a display'
+    )
+    parser.add_argument('models', metavar='MODEL.MS3D', nargs='+')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help='number of worker processes, defaults to the number of CPUs'
+    )
+    parser.add_argument(
+        '--cache', action='store_true', help='create or use model caches'
+    )
+    parser.add_argument(
+        '--compact', action='store_true',
+        help='pack the cached group buffers with the compact layout'
+    )
+    parser.add_argument(
+        '--output', metavar='DIR',
+        help='write a result for each model into DIR, under its path '
+             'relative to the directory holding all the models'
+    )
+    parser.add_argument(
+        '--arrays', default='', metavar='NAMES',
+        help='comma separated model arrays to save with the results, needs '
+             'Python 3.8: '
+             '{}'.format(', '.join(ARRAYS))
+    )
+
+    args = parser.parse_args(argv)
+    arrays = [name for name in args.arrays.split(',') if name]
+    if set(arrays) - set(ARRAYS):
+        parser.error('unknown arrays: {}'.format(
+            ', '.join(sorted(set(arrays) - set(ARRAYS)))
+        ))
+
+    failures = report(
+        run(args.models, args.jobs, args.cache, args.compact, arrays),
+        len(args.models), args.output, output_names(args.models)
+    )
+
+    return 1 if failures else 0
+
+
+def report(results, total, output=None, names=None):
+    """Print the progress of the results, writing them into `output`
+
+    :param names: The name to write each model's result as, by path, see
+        `output_names`
+
+    :returns: The number of models that failed
+    """
+    failures = 0
+
+    for done, result in enumerate(results, 1):
+        status = result.get('error', 'ok')
+        failures += 'error' in result
+
+        print('[{}/{}] {}: {}'.format(done, total, result['path'], status))
+
+        if output is not None:
+            write_result(output, names[result['path']], result)
+
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,7 +3,13 @@ I'm embracing Python 3.6 here, using __init_subclass__ and relying on the order
 of cls.__dict__
 '''
 import collections
+from collections.abc import Mapping
+import contextlib
+import itertools
 import struct
+import time
+
+import numpy as np
 
 from .decorator import reify
 
@@ -12,9 +18,65 @@ class DestructError(Exception):
     pass
 
 
+def read_exactly(fp, size):
+    """Read `size` bytes, raising `struct.error` like a single unpack would
+    when the data ends early
+    """
+    raw_data = fp.read(size)
+    if len(raw_data) != size:
+        raise struct.error('expected {} bytes, got {}'.format(
+            size, len(raw_data)
+        ))
+
+    return raw_data
+
+
+class Buffer(object):
+    """A read-only file-like object over anything supporting the buffer
+    protocol, like `bytes` or an `mmap.mmap`.
+
+    Reads return `memoryview` slices instead of copies, so arrays decoded
+    from a buffer are views into it.
+
+    :param buffer: The object to read from
+    :param offset: The position to start reading at
+    """
+    def __init__(self, buffer, offset=0):
+        self.view = memoryview(buffer).cast('B')
+        self.offset = offset
+
+    def read(self, size=-1):
+        start = self.offset
+        if size is None or size < 0:
+            self.offset = len(self.view)
+        else:
+            self.offset = min(start + size, len(self.view))
+
+        return self.view[start:self.offset]
+
+    def tell(self):
+        return self.offset
+
+    def seek(self, offset, whence=0):
+        origin = [0, self.offset, len(self.view)][whence]
+        self.offset = max(origin + offset, 0)
+        return self.offset
+
+
+Section = collections.namedtuple('Section', ['offset', 'count'])
+
+
 class Type(object):
     __types__ = []
 
+    #: Types that can be fused into a single `struct.Struct` have a layout,
+    #: which is a ``(byte_order, fmt)`` pair. ``None`` means the type has to
+    #: be decoded on its own.
+    layout = None
+
+    #: Whether `from_array` does more than return the array it was given
+    converts = False
+
     def __init__(self, *args, **kwargs):
         self.children = self.__types__ + [
             ('', child) for child in args if isinstance(child, Type)
@@ -31,13 +93,131 @@ class Type(object):
             )
         )
 
-    def serialize(self, fp):
+    def deserialize_instrumented(self, fp, report, path):
+        """Deserialize like `deserialize`, recording the bytes read and the
+        time spent under `path` in `report`.
+        """
+        return report.measure(path, fp, self.deserialize)
+
+    def serialize(self, data, fp):
         raise NotImplementedError(
             '{name} doesn\'t implement serialize'.format(
                 name=self.__class__.__name__
             )
         )
 
+    def assemble(self, values):
+        """Build the decoded value from an iterator over the values unpacked
+        with this types `layout`.
+        """
+        raise NotImplementedError(
+            '{name} doesn\'t implement assemble'.format(
+                name=self.__class__.__name__
+            )
+        )
+
+    @reify
+    def struct(self):
+        if self.layout is None:
+            return None
+
+        return struct.Struct('{}{}'.format(*self.layout))
+
+    @reify
+    def size(self):
+        """The size in bytes of the type, or None when it varies"""
+        if self.struct is None:
+            return None
+
+        return self.struct.size
+
+    def skip(self, fp):
+        """Move `fp` past a value of this type, without decoding it where
+        the size is known up front.
+
+        :returns: The number of elements skipped for sequence types, None
+            otherwise
+        """
+        if self.size is None:
+            self.deserialize(fp)
+        else:
+            fp.seek(self.size, 1)
+
+    @reify
+    def dtype(self):
+        """The numpy dtype matching this types `layout`, if there is one"""
+        return None
+
+    def from_array(self, array):
+        """Convert an array of raw records of this types `dtype` into the
+        decoded representation. Scalar types return the array as is.
+        """
+        return array
+
+    def to_array(self, data):
+        """The inverse of `from_array`, building an array of this types
+        `dtype`. `data` may also be a list of values as `deserialize`
+        returns them.
+        """
+        base, shape = self.dtype.subdtype or (self.dtype, ())
+        return np.asarray(data, base).reshape((-1,) + shape)
+
+    def deserialize_array(self, fp, count):
+        """Deserialize `count` consecutive values with a single read into a
+        numpy array, see `from_array` for the shape of the result.
+        """
+        if self.dtype is None:
+            raise DestructError(
+                '{name} doesn\'t have a fixed size layout'.format(
+                    name=self.__class__.__name__
+                )
+            )
+
+        raw_data = fp.read(self.dtype.itemsize * count)
+        return self.from_array(np.frombuffer(raw_data, self.dtype, count))
+
+    def deserialize_many(self, fp, count):
+        """Deserialize `count` consecutive values"""
+        if self.struct is None:
+            return [self.deserialize(fp) for _ in range(count)]
+
+        raw_data = read_exactly(fp, self.struct.size * count)
+
+        return [
+            self.assemble(iter(values))
+            for values in self.struct.iter_unpack(raw_data)
+        ]
+
+    @reify
+    def flat_length(self):
+        """The number of values unpacked by this types `struct`"""
+        return len(self.struct.unpack(bytes(self.struct.size)))
+
+    @reify
+    def decoder(self):
+        """A deserializer specialized for this type, see `Compiler`"""
+        return Compiler().compile(self)
+
+    def generate(self, compiler):
+        """Emit the statements deserializing this type into `compiler`.
+
+        :returns: The name of the variable holding the value
+        """
+        if self.struct is None:
+            return compiler.call(self)
+
+        values = iter(compiler.unpack(self))
+        return compiler.assign(self.assemble_source(compiler, values))
+
+    def assemble_source(self, compiler, names):
+        """Like `assemble`, but returns the source of an expression building
+        the value from an iterator over the names of the unpacked values.
+        """
+        return '{assemble}(iter(({values},)))'.format(
+            assemble=compiler.constant(self.assemble),
+            values=', '.join(itertools.islice(names, self.flat_length))
+        )
+
     @classmethod
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -49,21 +229,469 @@ class Type(object):
         ]
 
 
+def inline(deserialize):
+    """Mark a `deserialize` implementation as doing the same as the types
+    `generate`, so `Compiler` may inline it. Subclasses overriding
+    `deserialize` are called instead.
+    """
+    deserialize.inline = True
+    return deserialize
+
+
+class Compiler(object):
+    """Generates a Python function specialized for deserializing a type.
+
+    Fixed size values are read with a single `struct` unpack, and sequences,
+    dicts and tuples are built inline instead of dispatching to the
+    `deserialize` of every child.
+    """
+    def __init__(self):
+        self.lines = []
+        self.namespace = {'DestructError': DestructError}
+        self.counter = itertools.count()
+        self.depth = 1
+
+    def variable(self, prefix='v'):
+        return '{}{}'.format(prefix, next(self.counter))
+
+    def constant(self, value, prefix='c'):
+        """Make `value` available to the generated code"""
+        name = self.variable(prefix)
+        self.namespace[name] = value
+        return name
+
+    def emit(self, line):
+        self.lines.append('    ' * self.depth + line)
+
+    def assign(self, expression):
+        name = self.variable()
+        self.emit('{} = {}'.format(name, expression))
+        return name
+
+    @contextlib.contextmanager
+    def block(self, header):
+        self.emit(header)
+        self.depth += 1
+        yield
+        self.depth -= 1
+
+    @contextlib.contextmanager
+    def wrap(self, name):
+        """Raise a `DestructError` naming `name` when the statements emitted
+        in the block fail.
+        """
+        with self.block('try:'):
+            yield
+
+        with self.block('except Exception as e:'):
+            self.emit('raise DestructError({!r}) from e'.format(
+                'Error when trying to deserialize {}'.format(name)
+            ))
+
+    def call(self, type_):
+        return self.assign('{}(fp)'.format(self.constant(type_.deserialize)))
+
+    def value(self, type_):
+        """Emit the statements deserializing a child type"""
+        if getattr(type(type_).deserialize, 'inline', False):
+            return type_.generate(self)
+
+        return self.call(type_)
+
+    def unpack(self, type_):
+        """Emit a single read and unpack of a fixed size type.
+
+        :returns: The names of the unpacked values
+        """
+        names = [self.variable('a') for _ in range(type_.flat_length)]
+
+        self.emit('{names}, = {unpack}(read({size}))'.format(
+            names=', '.join(names),
+            unpack=self.constant(type_.struct.unpack, 'unpack'),
+            size=type_.struct.size
+        ))
+
+        return names
+
+    def compile(self, type_):
+        result = type_.generate(self)
+
+        source = '\n'.join(itertools.chain(
+            ['def deserialize(fp):', '    read = fp.read'],
+            self.lines,
+            ['    return {}'.format(result)]
+        ))
+        code = compile(
+            source, '<destruct {}>'.format(type_.__class__.__name__), 'exec'
+        )
+        exec(code, self.namespace)
+
+        deserialize = self.namespace['deserialize']
+        deserialize.source = source
+        return deserialize
+
+
+class Record(Mapping):
+    """Base class for the `__slots__` classes a `Struct` can decode into
+    instead of a dict, see `make_record`.
+
+    Fields are attributes, but records also behave as a read-only mapping so
+    they can stand in for the dicts.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except (AttributeError, TypeError):
+            raise KeyError(name)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return '{name}({fields})'.format(
+            name=self.__class__.__name__,
+            fields=', '.join(
+                '{}={!r}'.format(name, getattr(self, name))
+                for name in self.__slots__
+            )
+        )
+
+
+def make_record(name, fields, module=None, qualname=None):
+    """Create a `Record` subclass with a slot for each field, taking the
+    field values as positional arguments.
+
+    :param module: The module the class is found in, for pickle
+    :param qualname: The dotted path of the class within `module`
+    """
+    source = 'def __init__(self, {args}):\n{body}'.format(
+        args=', '.join(fields),
+        body=''.join('    self.{0} = {0}\n'.format(field) for field in fields)
+    )
+    namespace = {}
+    exec(source, namespace)
+
+    return type(name, (Record,), {
+        '__slots__': tuple(fields),
+        '__init__': namespace['__init__'],
+        '__module__': module or __name__,
+        '__qualname__': qualname or name,
+    })
+
+
+def fuse(children):
+    """Combine the layouts of `children` into a single layout.
+
+    Returns ``None`` unless every child has a layout and they all share the
+    same byte order.
+    """
+    layouts = [child.layout for _, child in children]
+
+    if not layouts or None in layouts:
+        return None
+
+    byte_orders = {byte_order for byte_order, _ in layouts}
+    if len(byte_orders) != 1:
+        return None
+
+    return byte_orders.pop(), ''.join(fmt for _, fmt in layouts)
+
+
+def record_dtype(children):
+    """Build a structured numpy dtype with a field per child"""
+    dtypes = [child.dtype for _, child in children]
+    names = [name for name, _ in children]
+
+    if not dtypes or None in dtypes:
+        return None
+
+    if '' in names or len(set(names)) != len(names):
+        return None
+
+    return np.dtype(list(zip(names, dtypes)))
+
+
+def tuple_dtype(children):
+    """Build a numpy dtype for a tuple of children.
+
+    Tuples of identical dtypes become a subarray, so that a tuple of three
+    floats is decoded as an (N, 3) array. Anything else becomes a structured
+    dtype with fields named f0, f1, ...
+    """
+    dtypes = [child.dtype for _, child in children]
+
+    if not dtypes or None in dtypes:
+        return None
+
+    if len(set(dtypes)) == 1:
+        base, shape = dtypes[0].subdtype or (dtypes[0], ())
+        return np.dtype((base, (len(dtypes),) + shape))
+
+    return np.dtype([
+        ('f{}'.format(index), dtype) for index, dtype in enumerate(dtypes)
+    ])
+
+
+def tuple_from_array(children, array):
+    """Convert the columns of a tuple decoded with `tuple_dtype`"""
+    if array.dtype.names:
+        return [
+            child.from_array(array[name])
+            for name, (_, child) in zip(array.dtype.names, children)
+        ]
+
+    if not any(child.converts for _, child in children):
+        return array
+
+    return np.stack([
+        child.from_array(array[..., index])
+        for index, (_, child) in enumerate(children)
+    ], axis=-1)
+
+
+def tuple_to_array(children, dtype, data):
+    """The inverse of `tuple_from_array`"""
+    if dtype.names:
+        # A list of tuples rather than the tuple of columns
+        if not isinstance(data, tuple):
+            data = [
+                [item[index] for item in data]
+                for index in range(len(children))
+            ]
+
+        array = np.empty(len(data[0]), dtype)
+        for name, (_, child), column in zip(dtype.names, children, data):
+            array[name] = child.to_array(column)
+
+        return array
+
+    data = np.asarray(data).reshape((-1,) + dtype.shape)
+
+    if not any(child.converts for _, child in children):
+        return data.astype(dtype.base)
+
+    return np.stack([
+        child.to_array(data[..., index])
+        for index, (_, child) in enumerate(children)
+    ], axis=-1)
+
+
 class Struct(Type):
-    """A mapping of values"""
-    def deserialize(self, fp):
-        result = []
+    """A mapping of values
+
+    Values are decoded into dicts. Subclasses declared with ``record=True``
+    decode into instances of a generated `Record` class instead, which
+    avoids the overhead of a dict per value.
+    """
+    record = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # The record class only has slots for the fields of the class
+        if len(self.children) != len(self.__types__):
+            self.record = None
+
+    @classmethod
+    def __init_subclass__(cls, record=False, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        cls.record = None
+        if record:
+            cls.record = make_record(
+                cls.__name__ + 'Record',
+                [name for name, _ in cls.__types__],
+                module=cls.__module__,
+                qualname=cls.__qualname__ + '.record'
+            )
+
+    def build_source(self, compiler, values):
+        """The source of an expression building a value from the sources of
+        its field values.
+        """
+        if self.record is not None:
+            return '{}({})'.format(
+                compiler.constant(self.record, 'record'), ', '.join(values)
+            )
+
+        return '{{{}}}'.format(', '.join(
+            '{!r}: {}'.format(name, value)
+            for (name, _), value in zip(self.children, values)
+        ))
+
+    def build(self, values):
+        """Build a value from its decoded field values"""
+        if self.record is not None:
+            return self.record(*values)
+
+        return {
+            name: value for (name, _), value in zip(self.children, values)
+        }
+
+    @reify
+    def layout(self):
+        return fuse(self.children)
+
+    @reify
+    def converts(self):
+        return any(child.converts for _, child in self.children)
+
+    @reify
+    def dtype(self):
+        return record_dtype(self.children)
+
+    @reify
+    def size(self):
+        sizes = [child.size for _, child in self.children]
+
+        if not sizes or None in sizes:
+            return None
+
+        return sum(sizes)
+
+    def skip(self, fp):
+        if self.size is not None:
+            fp.seek(self.size, 1)
+            return
+
+        for name, child in self.children:
+            child.skip(fp)
+
+    def index(self, fp):
+        """Find where each field starts without decoding them.
+
+        :returns: An ordered mapping of field name to `Section`
+        """
+        sections = collections.OrderedDict()
+
+        for name, child in self.children:
+            offset = fp.tell()
+            sections[name] = Section(offset, child.skip(fp))
+
+        return sections
+
+    def deserialize_lazy(self, fp):
+        """Deserialize fields on first access, see `LazyStruct`"""
+        sections = self.index(fp)
+
+        return LazyStruct(fp, sections, {
+            name: child.deserialize for name, child in self.children
+        })
+
+    def stream(self, fp, name, chunk_size=1024):
+        """Stream the elements of the sequence field `name`, skipping over the
+        fields before it. See `Sequence.stream`.
+        """
+        for field, child in self.children:
+            if field == name:
+                return child.stream(fp, chunk_size)
+
+            child.skip(fp)
+
+        raise KeyError(name)
+
+    def assemble(self, values):
+        if self.record is not None:
+            return self.record(*[
+                child.assemble(values) for _, child in self.children
+            ])
+
+        return {
+            name: child.assemble(values)
+            for name, child in self.children
+        }
+
+    def from_array(self, array):
+        return {
+            name: child.from_array(array[name])
+            for name, child in self.children
+        }
+
+    def to_array(self, data):
+        # A list of records rather than a mapping of columns
+        if not isinstance(data, Mapping):
+            data = {
+                name: [record[name] for record in data]
+                for name, _ in self.children
+            }
+
+        columns = [
+            (name, child.to_array(data[name]))
+            for name, child in self.children
+        ]
+
+        array = np.empty(len(columns[0][1]), self.dtype)
+        for name, column in columns:
+            array[name] = column
+
+        return array
+
+    def assemble_source(self, compiler, names):
+        return self.build_source(compiler, [
+            child.assemble_source(compiler, names)
+            for _, child in self.children
+        ])
+
+    def generate(self, compiler):
+        if self.struct is not None:
+            with compiler.wrap(self.__class__.__name__):
+                result = super().generate(compiler)
+
+            return result
+
+        values = []
+        for name, child in self.children:
+            with compiler.wrap(name):
+                values.append(compiler.value(child))
+
+        return compiler.assign(self.build_source(compiler, values))
+
+    @inline
+    def deserialize(self, fp, report=None):
+        """Deserialize a value from `fp`
+
+        :param report: A `Report` to record how long each field took to
+            decode in, which is slower than decoding without one
+        """
+        if report is not None:
+            return self.deserialize_fields(fp, report, '')
+
+        return self.decoder(fp)
+
+    def deserialize_instrumented(self, fp, report, path):
+        # Only the fields of structs decoded by the generated decoder are
+        # known to be decoded one after another
+        if type(self).deserialize is not Struct.deserialize:
+            return super().deserialize_instrumented(fp, report, path)
+
+        return self.deserialize_fields(fp, report, path)
+
+    def deserialize_fields(self, fp, report, path):
+        """Deserialize the fields one by one, recording each in `report`"""
+        report.enter(path)
+        start, started = fp.tell(), time.perf_counter()
+
+        values = []
         for name, child in self.children:
             try:
-                result.append((name, child.deserialize(fp)))
+                values.append(child.deserialize_instrumented(
+                    fp, report, join_path(path, name)
+                ))
             except Exception as e:
                 raise DestructError(
-                    'Error when trying to deserialize {name}'.format(
-                        name=name
-                    )
+                    'Error when trying to deserialize {}'.format(name)
                 ) from e
 
-        return dict(result)
+        report.record(
+            path, fp.tell() - start, 1, time.perf_counter() - started
+        )
+
+        return self.build(values)
 
     def serialize(self, data, fp):
         for name, child in self.children:
@@ -72,11 +700,50 @@ class Struct(Type):
 
 class Tuple(Type):
     """A tuple of values."""
-    def deserialize(self, fp):
-        return tuple(
-            child.deserialize(fp)
+    @reify
+    def layout(self):
+        return fuse(self.children)
+
+    @reify
+    def converts(self):
+        return any(child.converts for _, child in self.children)
+
+    @reify
+    def dtype(self):
+        return tuple_dtype(self.children)
+
+    def assemble(self, values):
+        return tuple(child.assemble(values) for _, child in self.children)
+
+    def from_array(self, array):
+        columns = tuple_from_array(self.children, array)
+
+        if isinstance(columns, list):
+            return tuple(columns)
+
+        return columns
+
+    def to_array(self, data):
+        return tuple_to_array(self.children, self.dtype, data)
+
+    def assemble_source(self, compiler, names):
+        return '({})'.format(''.join(
+            '{}, '.format(child.assemble_source(compiler, names))
             for _, child in self.children
-        )
+        ))
+
+    def generate(self, compiler):
+        if self.struct is not None:
+            return super().generate(compiler)
+
+        return compiler.assign('({})'.format(''.join(
+            '{}, '.format(compiler.value(child))
+            for _, child in self.children
+        )))
+
+    @inline
+    def deserialize(self, fp):
+        return self.decoder(fp)
 
     def serialize(self, data, fp):
         for (name, child), element in zip(self.children, data):
@@ -92,12 +759,56 @@ class NamedTuple(Type):
             [name for name, child in self.children]
         )
 
-    def deserialize(self, fp):
+    @reify
+    def layout(self):
+        return fuse(self.children)
+
+    @reify
+    def converts(self):
+        return any(child.converts for _, child in self.children)
+
+    @reify
+    def dtype(self):
+        return tuple_dtype(self.children)
+
+    def assemble(self, values):
         return self.namedtuple._make(
-            child.deserialize(fp)
-            for name, child in self.children
+            child.assemble(values) for _, child in self.children
+        )
+
+    def from_array(self, array):
+        columns = tuple_from_array(self.children, array)
+
+        if isinstance(columns, list):
+            return self.namedtuple._make(columns)
+
+        return columns
+
+    def to_array(self, data):
+        return tuple_to_array(self.children, self.dtype, data)
+
+    def assemble_source(self, compiler, names):
+        return '{}({})'.format(
+            compiler.constant(self.namedtuple, 'namedtuple'),
+            ', '.join(
+                child.assemble_source(compiler, names)
+                for _, child in self.children
+            )
         )
 
+    def generate(self, compiler):
+        if self.struct is not None:
+            return super().generate(compiler)
+
+        return compiler.assign('{}({})'.format(
+            compiler.constant(self.namedtuple, 'namedtuple'),
+            ', '.join(compiler.value(child) for _, child in self.children)
+        ))
+
+    @inline
+    def deserialize(self, fp):
+        return self.decoder(fp)
+
     def serialize(self, data, fp):
         for (name, child), element in zip(self.children, data):
             child.serialize(element, fp)
@@ -113,10 +824,38 @@ class Number(Type):
         self.fmt = fmt
         self.byte_order = byte_order
 
+    @reify
+    def layout(self):
+        # Native alignment ('@') pads between fields, so those can't be fused
+        if self.byte_order == '@':
+            return None
+
+        return self.byte_order, self.fmt
+
     @reify
     def struct(self):
         return struct.Struct('{byte_order}{fmt}'.format_map(vars(self)))
 
+    @reify
+    def dtype(self):
+        if self.layout is None:
+            return None
+
+        # numpy spells network byte order as big endian
+        byte_order = self.byte_order.replace('!', '>')
+
+        try:
+            return np.dtype(byte_order + self.fmt)
+        except TypeError:
+            return None
+
+    def assemble(self, values):
+        return next(values)
+
+    def assemble_source(self, compiler, names):
+        return next(names)
+
+    @inline
     def deserialize(self, fp):
         raw_data = fp.read(self.struct.size)
         result, = self.struct.unpack(raw_data)
@@ -137,21 +876,175 @@ class Sequence(Type):
         self.length_type = length_type
         self.target_type = target_type
 
+    def generate(self, compiler):
+        length = compiler.value(self.length_type)
+        target = self.target_type
+
+        if target.struct is None:
+            result = compiler.assign('[]')
+
+            with compiler.block('for _ in range({}):'.format(length)):
+                compiler.emit('{}.append({})'.format(
+                    result, compiler.value(target)
+                ))
+
+            return result
+
+        names = [compiler.variable('a') for _ in range(target.flat_length)]
+
+        return compiler.assign(
+            '[{value} for {names}, in {iter_unpack}('
+            '{read_exactly}(fp, {size} * {length}))]'
+            .format(
+                value=target.assemble_source(compiler, iter(names)),
+                names=', '.join(names),
+                iter_unpack=compiler.constant(
+                    target.struct.iter_unpack, 'iter_unpack'
+                ),
+                read_exactly=compiler.constant(read_exactly, 'read_exactly'),
+                size=target.struct.size,
+                length=length
+            )
+        )
+
+    @inline
     def deserialize(self, fp):
+        return self.decoder(fp)
+
+    def deserialize_elements(self, fp, length):
+        """Deserialize the `length` elements following the length"""
+        return self.target_type.deserialize_many(fp, length)
+
+    def deserialize_instrumented(self, fp, report, path):
+        report.enter(path)
+        start, started = fp.tell(), time.perf_counter()
         length = self.length_type.deserialize(fp)
 
-        return [
-            self.target_type.deserialize(fp)
-            for _ in range(length)
-        ]
+        # Fixed size elements are decoded all at once, so only variable size
+        # elements get an entry of their own
+        if self.target_type.size is None:
+            element_path = path + '[]'
+            value = [
+                self.target_type.deserialize_instrumented(
+                    fp, report, element_path
+                )
+                for _ in range(length)
+            ]
+        else:
+            value = self.deserialize_elements(fp, length)
+
+        report.record(
+            path, fp.tell() - start, length, time.perf_counter() - started
+        )
+
+        return value
+
+    def skip(self, fp):
+        length = self.length_type.deserialize(fp)
+
+        if self.target_type.size is None:
+            for _ in range(length):
+                self.target_type.skip(fp)
+        else:
+            fp.seek(self.target_type.size * length, 1)
+
+        return length
+
+    def stream(self, fp, chunk_size=1024):
+        """Decode the elements as they are iterated over instead of all at
+        once, see `SequenceStream`.
+        """
+        length = self.length_type.deserialize(fp)
+
+        return SequenceStream(fp, self.target_type, length, chunk_size)
 
     def serialize(self, data, fp):
+        # Fixed size elements are packed into an array and written at once
+        if self.target_type.dtype is not None:
+            array = self.target_type.to_array(data)
+
+            self.length_type.serialize(len(array), fp)
+            fp.write(array.tobytes())
+            return
+
         self.length_type.serialize(len(data), fp)
 
         for element in data:
             self.target_type.serialize(element, fp)
 
 
+class SequenceStream(object):
+    """An iterator over the elements of a sequence, decoding up to
+    `chunk_size` of them at a time so memory use doesn't grow with the length
+    of the sequence.
+
+    :param fp: The file-like object positioned at the first element
+    :param target_type: The type of the elements
+    :param length: The number of elements in the sequence
+    :param chunk_size: The number of elements to decode per read
+    """
+    def __init__(self, fp, target_type, length, chunk_size=1024):
+        self.fp = fp
+        self.target_type = target_type
+        self.length = length
+        self.chunk_size = chunk_size
+        self.remaining = length
+        self.chunk = collections.deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.chunk:
+            if not self.remaining:
+                raise StopIteration
+
+            count = min(self.chunk_size, self.remaining)
+            self.chunk.extend(
+                self.target_type.deserialize_many(self.fp, count)
+            )
+            self.remaining -= count
+
+        return self.chunk.popleft()
+
+    def __len__(self):
+        return self.length
+
+    def skip(self):
+        """Skip the elements that haven't been decoded yet, leaving `fp` at the
+        end of the sequence.
+        """
+        self.chunk.clear()
+
+        if self.target_type.size is None:
+            for _ in range(self.remaining):
+                self.target_type.skip(self.fp)
+        else:
+            self.fp.seek(self.target_type.size * self.remaining, 1)
+
+        self.remaining = 0
+
+
+class Array(Sequence):
+    """A variable-length sequence of fixed size records, decoded in bulk into
+    numpy arrays.
+
+    Records that are a `Struct` are returned as a dict of columns, so a
+    sequence of vertices becomes ``{'vertex': (N, 3) array, ...}``. Both the
+    columns and a list of records can be serialized.
+
+    :param length_type: The type to use to decode the length of the sequence
+    :param target_type: The fixed size type to decode <length> times
+    """
+    def deserialize(self, fp):
+        length = self.length_type.deserialize(fp)
+
+        return self.deserialize_elements(fp, length)
+
+    def deserialize_elements(self, fp, length):
+        return self.target_type.deserialize_array(fp, length)
+
+
 class String(Type):
     """A fixed length string.
 
@@ -163,8 +1056,20 @@ class String(Type):
         self.length = length
         self.encoding = encoding
 
+    @reify
+    def size(self):
+        return self.length
+
+    def generate(self, compiler):
+        return compiler.assign(
+            'bytes(read({})).partition(b\'\\x00\')[0].decode({!r})'.format(
+                self.length, self.encoding
+            )
+        )
+
+    @inline
     def deserialize(self, fp):
-        raw_string, _, _ = fp.read(self.length).partition(b'\x00')
+        raw_string, _, _ = bytes(fp.read(self.length)).partition(b'\x00')
 
         return raw_string.decode(self.encoding)
 
@@ -183,9 +1088,18 @@ class DynamicString(Type):
         self.length_type = length_type
         self.encoding = encoding
 
+    def generate(self, compiler):
+        return compiler.assign('bytes(read({})).decode({!r})'.format(
+            compiler.value(self.length_type), self.encoding
+        ))
+
+    @inline
     def deserialize(self, fp):
         length = self.length_type.deserialize(fp)
-        return fp.read(length).decode(self.encoding)
+        return bytes(fp.read(length)).decode(self.encoding)
+
+    def skip(self, fp):
+        fp.seek(self.length_type.deserialize(fp), 1)
 
     def serialize(self, data, fp):
         raw_data = data.encode(self.encoding)
@@ -203,9 +1117,126 @@ class Signature(Type):
         super().__init__()
         self.signature = signature
 
+    @reify
+    def size(self):
+        return len(self.signature)
+
     def deserialize(self, fp):
-        raw_data = fp.read(len(self.signature))
+        raw_data = bytes(fp.read(len(self.signature)))
 
         assert raw_data == self.signature, 'File signature doesn\'t match!'
 
         return raw_data
+
+    def serialize(self, data, fp):
+        fp.write(self.signature)
+
+
+def join_path(path, name):
+    if not path:
+        return name
+
+    return '{}.{}'.format(path, name)
+
+
+Measurement = collections.namedtuple(
+    'Measurement', ['size', 'count', 'time']
+)
+
+
+class Report(Mapping):
+    """Where the time went while deserializing, as a mapping of path to the
+    `Measurement` of the bytes read, the number of values decoded and the
+    seconds spent decoding them. Paths name struct fields separated by dots,
+    with elements of variable size sequences marked by ``[]``, like
+    ``comments.group[].comment``.
+
+    Times include the time spent on the values inside, and the same path is
+    accumulated over every element of a sequence.
+    """
+    def __init__(self):
+        self.measurements = collections.OrderedDict()
+
+    def enter(self, path):
+        """List `path` ahead of the paths inside of it"""
+        if path and path not in self.measurements:
+            self.measurements[path] = Measurement(0, 0, 0.0)
+
+    def record(self, path, size, count, time):
+        # The whole value isn't interesting on its own
+        if not path:
+            return
+
+        measurement = self.measurements.get(path)
+        if measurement is not None:
+            size += measurement.size
+            count += measurement.count
+            time += measurement.time
+
+        self.measurements[path] = Measurement(size, count, time)
+
+    def measure(self, path, fp, deserialize, count=1):
+        """Deserialize a value with `deserialize` and record it under
+        `path`
+        """
+        start, started = fp.tell(), time.perf_counter()
+        value = deserialize(fp)
+        self.record(
+            path, fp.tell() - start, count, time.perf_counter() - started
+        )
+
+        return value
+
+    def format(self):
+        """Format the report as a table"""
+        width = max([len(path) for path in self] + [4])
+
+        return '\n'.join(itertools.chain([
+            '{:<{width}} {:>10} {:>8} {:>10}'.format(
+                'path', 'bytes', 'count', 'ms', width=width
+            )
+        ], (
+            '{:<{width}} {:>10} {:>8} {:>10.3f}'.format(
+                path, size, count, elapsed * 1000, width=width
+            )
+            for path, (size, count, elapsed) in self.items()
+        )))
+
+    def __getitem__(self, path):
+        return self.measurements[path]
+
+    def __iter__(self):
+        return iter(self.measurements)
+
+    def __len__(self):
+        return len(self.measurements)
+
+
+class LazyStruct(Mapping):
+    """A read-only mapping that deserializes each value the first time it is
+    accessed. `fp` has to stay open and seekable for as long as values are
+    being accessed.
+
+    :param fp: The file-like object to deserialize from
+    :param sections: Mapping of name to the `Section` the value starts at
+    :param loaders: Mapping of name to a callable deserializing the value
+        from `fp`
+    """
+    def __init__(self, fp, sections, loaders):
+        self.fp = fp
+        self.sections = sections
+        self.loaders = loaders
+        self.values = {}
+
+    def __getitem__(self, name):
+        if name not in self.values:
+            self.fp.seek(self.sections[name].offset)
+            self.values[name] = self.loaders[name](self.fp)
+
+        return self.values[name]
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def __len__(self):
+        return len(self.sections)
@@ -0,0 +1,81 @@
+"""Deserialize destruct types from an `asyncio.StreamReader`
+
+An adapter walking the tree of the `destruct` types, so parsing can wait for
+data as it arrives while the types themselves stay synchronous. Types with a
+fixed size wait for all of their bytes and decode them with their own
+`deserialize`. Structs, tuples, sequences and dynamic strings wait for their
+parts one at a time, and other types register a coroutine with `walk`.
+
+This module needs Python 3.6, import it only where coroutines are used.
+"""
+import functools
+
+from . import destruct
+from .destruct import Buffer, DestructError
+
+
+async def deserialize(type_, reader):
+    """Deserialize a value of `type_` from `reader`"""
+    if type_.size is not None:
+        raw_data = await reader.readexactly(type_.size)
+        return type_.deserialize(Buffer(raw_data))
+
+    return await walk(type_, reader)
+
+
+@functools.singledispatch
+async def walk(type_, reader):
+    """Deserialize a value of a type that doesn't have a fixed size"""
+    raise NotImplementedError(
+        '{name} doesn\'t implement deserialize_async'.format(
+            name=type_.__class__.__name__
+        )
+    )
+
+
+@walk.register(destruct.Struct)
+async def walk_struct(type_, reader):
+    values = []
+    for name, child in type_.children:
+        try:
+            values.append(await deserialize(child, reader))
+        except Exception as e:
+            raise DestructError(
+                'Error when trying to deserialize {}'.format(name)
+            ) from e
+
+    return type_.build(values)
+
+
+@walk.register(destruct.Tuple)
+async def walk_tuple(type_, reader):
+    return tuple([
+        await deserialize(child, reader) for _, child in type_.children
+    ])
+
+
+@walk.register(destruct.NamedTuple)
+async def walk_named_tuple(type_, reader):
+    return type_.namedtuple._make([
+        await deserialize(child, reader) for _, child in type_.children
+    ])
+
+
+@walk.register(destruct.Sequence)
+async def walk_sequence(type_, reader):
+    length = await deserialize(type_.length_type, reader)
+    target = type_.target_type
+
+    if target.size is None:
+        return [await deserialize(target, reader) for _ in range(length)]
+
+    raw_data = await reader.readexactly(target.size * length)
+    return type_.deserialize_elements(Buffer(raw_data), length)
+
+
+@walk.register(destruct.DynamicString)
+async def walk_dynamic_string(type_, reader):
+    length = await deserialize(type_.length_type, reader)
+    raw_data = await reader.readexactly(length)
+
+    return raw_data.decode(type_.encoding)
@@ -57,6 +57,25 @@ def rotation(rotation):
     ], dtype=np.float32)
 
 
+def rotations(angles):
+    """The matrices `rotation` makes, for an array of euler angles at once"""
+    angles = np.asarray(angles, dtype=np.float64).reshape(-1, 3)
+    sx, sy, sz = np.sin(angles).T
+    cx, cy, cz = np.cos(angles).T
+
+    matrices = np.zeros((len(angles), 4, 4), dtype=np.float32)
+    matrices[:, 0, :3] = np.stack([
+        cy * cz, sx * sy * cz - sz * cx, sx * sz + sy * cx * cz
+    ], axis=-1)
+    matrices[:, 1, :3] = np.stack([
+        sz * cy, sx * sy * sz + cx * cz, -sx * cz + sy * sz * cx
+    ], axis=-1)
+    matrices[:, 2, :3] = np.stack([-sy, sx * cy, cx * cy], axis=-1)
+    matrices[:, 3, 3] = 1
+
+    return matrices
+
+
 def axis_angle_rotation(angle, axis):
     c = cos(angle)
     s = sin(angle)
@@ -80,6 +99,16 @@ def translate(translation):
     ], dtype=np.float32)
 
 
+def translations(offsets):
+    """The matrices `translate` makes, for an array of offsets at once"""
+    offsets = np.asarray(offsets).reshape(-1, 3)
+
+    matrices = np.tile(np.identity(4, dtype=np.float32), (len(offsets), 1, 1))
+    matrices[:, :3, 3] = offsets
+
+    return matrices
+
+
 def scale(scale):
     x, y, z = scale
     return np.array([
@@ -130,3 +159,111 @@ def ortho(left, right, bottom, top, near, far):
         [0, 0, 2 / (far - near), tz],
         [0, 0, 0, 1]
     ], dtype=np.float32)
+
+
+def euler_quaternions(angles):
+    """The quaternions (x, y, z, w) of the rotations `rotation` makes, for
+    an array of euler angles at once
+    """
+    half = np.asarray(angles, dtype=np.float64).reshape(-1, 3) / 2
+    sx, sy, sz = np.sin(half).T
+    cx, cy, cz = np.cos(half).T
+
+    return np.stack([
+        sx * cy * cz - cx * sy * sz,
+        cx * sy * cz + sx * cy * sz,
+        cx * cy * sz - sx * sy * cz,
+        cx * cy * cz + sx * sy * sz
+    ], axis=-1)
+
+
+def quaternion_multiply(a, b):
+    """The products of arrays of quaternions (x, y, z, w)"""
+    ax, ay, az, aw = np.moveaxis(np.asarray(a), -1, 0)
+    bx, by, bz, bw = np.moveaxis(np.asarray(b), -1, 0)
+
+    return np.stack([
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+        aw * bw - ax * bx - ay * by - az * bz
+    ], axis=-1)
+
+
+def quaternion_rotate(q, v):
+    """Rotate arrays of vectors by arrays of unit quaternions"""
+    q = np.asarray(q)
+    xyz, w = q[..., :3], q[..., 3:]
+    t = 2 * np.cross(xyz, v)
+
+    return v + w * t + np.cross(xyz, t)
+
+
+def matrix_quaternions(matrices):
+    """The unit quaternions of the rotation part of an array of matrices.
+    Each is computed from its largest component, which keeps it accurate
+    for every rotation.
+    """
+    m = np.asarray(matrices, dtype=np.float64)
+    m00, m11, m22 = m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]
+
+    magnitudes = np.sqrt(np.maximum(0, np.stack([
+        1 + m00 - m11 - m22,
+        1 - m00 + m11 - m22,
+        1 - m00 - m11 + m22,
+        1 + m00 + m11 + m22
+    ], axis=-1))) / 2
+    x, y, z, w = np.moveaxis(magnitudes, -1, 0)
+    dx, dy, dz, dw = np.moveaxis(4 * np.maximum(magnitudes, 1e-12), -1, 0)
+
+    a = m[..., 2, 1] - m[..., 1, 2]
+    b = m[..., 0, 2] - m[..., 2, 0]
+    c = m[..., 1, 0] - m[..., 0, 1]
+    p = m[..., 0, 1] + m[..., 1, 0]
+    q = m[..., 0, 2] + m[..., 2, 0]
+    r = m[..., 1, 2] + m[..., 2, 1]
+
+    candidates = np.stack([
+        np.stack([x, p / dx, q / dx, a / dx], axis=-1),
+        np.stack([p / dy, y, r / dy, b / dy], axis=-1),
+        np.stack([q / dz, r / dz, z, c / dz], axis=-1),
+        np.stack([a / dw, b / dw, c / dw, w], axis=-1),
+    ], axis=-2)
+
+    largest = np.argmax(magnitudes, axis=-1)[..., np.newaxis, np.newaxis]
+    return np.take_along_axis(candidates, largest, axis=-2)[..., 0, :]
+
+
+def continuous_quaternions(quaternions):
+    """Flip the signs of an array of quaternions along its first axis, so
+    each one is on the same side as the one before it, and interpolating
+    between them takes the short way round
+    """
+    quaternions = np.asarray(quaternions)
+
+    dots = np.sum(quaternions[1:] * quaternions[:-1], axis=-1)
+    flips = np.where(dots < 0, -1.0, 1.0)
+    signs = np.cumprod(
+        np.concatenate([np.ones_like(flips[:1]), flips]), axis=0
+    )
+
+    return quaternions * signs[..., np.newaxis]
+
+
+def quaternion_matrices(q):
+    """The rotation matrices of an array of unit quaternions"""
+    x, y, z, w = np.moveaxis(np.asarray(q), -1, 0)
+
+    matrices = np.zeros(x.shape + (4, 4))
+    matrices[..., 0, :3] = np.stack([
+        1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)
+    ], axis=-1)
+    matrices[..., 1, :3] = np.stack([
+        2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)
+    ], axis=-1)
+    matrices[..., 2, :3] = np.stack([
+        2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)
+    ], axis=-1)
+    matrices[..., 3, 3] = 1
+
+    return matrices
@@ -0,0 +1,372 @@
+"""Helpers for preparing indexed triangle meshes for rendering"""
+import collections
+import functools
+
+import numpy as np
+
+
+def rows(array):
+    """View each row of `array` as a single opaque value, so rows can be
+    compared and sorted as a whole.
+    """
+    array = np.ascontiguousarray(array).reshape(len(array), -1)
+    size = array.dtype.itemsize * array.shape[1]
+
+    return array.view(np.dtype((np.void, size)))
+
+
+def weld(*attributes):
+    """Merge the corners that are identical in every attribute into a single
+    vertex.
+
+    Corners are compared bytewise by sorting, so it takes O(n log n) time
+    instead of comparing every pair of corners. Vertices keep the order
+    their first corner appears in.
+
+    :param attributes: Arrays with a row for each corner
+    :returns: The first corner of each vertex, and the vertex of each corner
+    """
+    if not len(attributes[0]):
+        return np.empty(0, np.intp), np.empty(0, np.intp)
+
+    keys = rows(np.hstack([
+        rows(attribute).view(np.uint8).reshape(len(attribute), -1)
+        for attribute in attributes
+    ]))[:, 0]
+
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    # np.unique orders the vertices by their bytes, put them back in order of
+    # appearance
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    return first[order], rank[inverse.reshape(-1)]
+
+
+def index_buffer(indices):
+    """Pack vertex indices into the smallest unsigned type OpenGL can draw"""
+    if len(indices) and indices.max() > np.iinfo(np.uint16).max:
+        return np.asarray(indices, dtype=np.uint32)
+
+    return np.asarray(indices, dtype=np.uint16)
+
+
+def acmr(indices, cache_size=16):
+    """The average cache miss ratio of drawing `indices`, the number of
+    vertices transformed per triangle with a FIFO post-transform cache of
+    `cache_size` vertices. It ranges from 3 down to about 0.5.
+    """
+    indices = np.asarray(indices).reshape(-1)
+    if not len(indices):
+        return 0.0
+
+    cache = collections.deque()
+    cached = set()
+    misses = 0
+
+    for vertex in indices.tolist():
+        if vertex in cached:
+            continue
+
+        misses += 1
+        cache.append(vertex)
+        cached.add(vertex)
+
+        if len(cache) > cache_size:
+            cached.discard(cache.popleft())
+
+    return misses / (len(indices) // 3)
+
+
+def vertex_triangles(indices, vertex_count):
+    """The triangles using each vertex"""
+    triangles = [[] for _ in range(vertex_count)]
+
+    for triangle, vertices in enumerate(indices):
+        for vertex in vertices:
+            triangles[vertex].append(triangle)
+
+    return triangles
+
+
+class Tipsify(object):
+    """Order triangles to reuse the post-transform vertex cache, using the
+    Tipsify algorithm from "Fast Triangle Reordering for Vertex Locality and
+    Reduced Overdraw" by Sander, Nehab and Barczak.
+
+    Triangles are emitted in fans around a vertex, moving on to the vertex
+    that is most likely to still be in the cache and has triangles left.
+
+    :param indices: The vertex indices of each triangle
+    :param vertex_count: The number of vertices the triangles index
+    :param cache_size: The number of vertices in the cache
+    """
+    def __init__(self, indices, vertex_count, cache_size=16):
+        self.indices = np.asarray(indices).reshape(-1, 3).tolist()
+        self.triangles = vertex_triangles(self.indices, vertex_count)
+        self.live = [len(triangles) for triangles in self.triangles]
+        self.cache_time = [0] * vertex_count
+        self.emitted = [False] * len(self.indices)
+        self.dead_ends = []
+        self.cache_size = cache_size
+        self.time = cache_size + 1
+        self.cursor = 0
+
+    def order(self):
+        """The reordered triangle indices"""
+        order = []
+
+        vertex = self.skip_dead_end()
+        while vertex >= 0:
+            vertex = self.next_vertex(self.fan(vertex, order))
+
+        return np.array(order, dtype=np.intp)
+
+    def fan(self, vertex, order):
+        """Emit the remaining triangles around `vertex` into `order`
+
+        :returns: The vertices of the emitted triangles
+        """
+        candidates = []
+
+        for triangle in self.triangles[vertex]:
+            if self.emitted[triangle]:
+                continue
+
+            self.emitted[triangle] = True
+            order.append(triangle)
+
+            for corner in self.indices[triangle]:
+                self.emit_vertex(corner)
+                candidates.append(corner)
+
+        return candidates
+
+    def emit_vertex(self, vertex):
+        self.dead_ends.append(vertex)
+        self.live[vertex] -= 1
+
+        if self.time - self.cache_time[vertex] > self.cache_size:
+            self.cache_time[vertex] = self.time
+            self.time += 1
+
+    def priority(self, vertex):
+        if not self.live[vertex]:
+            return -1
+
+        # Prefer the oldest vertex that stays in the cache while its
+        # remaining triangles are emitted
+        age = self.time - self.cache_time[vertex]
+        if age + 2 * self.live[vertex] <= self.cache_size:
+            return age
+
+        return 0
+
+    def next_vertex(self, candidates):
+        best, best_priority = -1, -1
+
+        for vertex in candidates:
+            priority = self.priority(vertex)
+            if priority > best_priority:
+                best, best_priority = vertex, priority
+
+        if best < 0:
+            return self.skip_dead_end()
+
+        return best
+
+    def skip_dead_end(self):
+        """Find a vertex with triangles left, starting with the most
+        recently used ones.
+        """
+        while self.dead_ends:
+            vertex = self.dead_ends.pop()
+            if self.live[vertex]:
+                return vertex
+
+        while self.cursor < len(self.live):
+            if self.live[self.cursor]:
+                return self.cursor
+
+            self.cursor += 1
+
+        return -1
+
+
+def tipsify(indices, vertex_count, cache_size=16):
+    """Reorder triangles for the post-transform vertex cache, see `Tipsify`
+
+    :returns: The new order of the triangles
+    """
+    return Tipsify(indices, vertex_count, cache_size).order()
+
+
+def octahedral_encode(normals):
+    """Encode unit normals as two normalized int16, by projecting them onto
+    an octahedron and folding its lower half over the upper half.
+    """
+    normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+    length = np.abs(normals).sum(axis=1, keepdims=True)
+    normals = normals / np.maximum(length, np.finfo(np.float64).tiny)
+
+    xy = normals[:, :2]
+    folded = (1 - np.abs(xy[:, ::-1])) * np.where(xy < 0, -1, 1)
+    xy = np.where(normals[:, 2:] < 0, folded, xy)
+
+    return np.round(np.clip(xy, -1, 1) * 32767).astype(np.int16)
+
+
+def octahedral_decode(encoded):
+    """Decode normals encoded with `octahedral_encode`"""
+    xy = np.asarray(encoded, dtype=np.float64).reshape(-1, 2) / 32767
+    z = 1 - np.abs(xy).sum(axis=1, keepdims=True)
+
+    unfolded = (1 - np.abs(xy[:, ::-1])) * np.where(xy < 0, -1, 1)
+    xy = np.where(z < 0, unfolded, xy)
+
+    normals = np.hstack([xy, z])
+    return normals / np.linalg.norm(normals, axis=1, keepdims=True)
+
+
+def quantize_weights(weights, dtype):
+    """Quantize bone weights into normalized integers of `dtype`, keeping
+    each vertex's weights summing to exactly the largest value of the type.
+    """
+    maximum = np.iinfo(dtype).max
+    weights = np.asarray(weights, dtype=np.float64)
+    quantized = np.round(weights * maximum).astype(np.int64)
+
+    # Give whatever rounding lost or added to each vertex's heaviest bone
+    heaviest = np.argmax(weights, axis=1)
+    rows = np.arange(len(weights))
+    quantized[rows, heaviest] += maximum - quantized.sum(axis=1)
+
+    return np.clip(quantized, 0, maximum).astype(dtype)
+
+
+def unsigned_ids(bone_ids, dtype):
+    """Store bone ids in an unsigned type, with -1 becoming its largest
+    value
+    """
+    bone_ids = np.asarray(bone_ids)
+    return np.where(bone_ids < 0, np.iinfo(dtype).max, bone_ids).astype(dtype)
+
+
+class VertexAttribute(object):
+    """An attribute of an interleaved vertex buffer
+
+    :param name: The name of the attribute
+    :param dtype: The numpy type of each component
+    :param components: The number of components
+    :param normalized: Whether integer components map to [0, 1] or [-1, 1]
+        in the shader
+    :param encode: A function converting the attribute's values into
+        `dtype`, defaults to a plain cast
+    """
+    def __init__(self, name, dtype, components, normalized=False, encode=None):
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.components = components
+        self.normalized = normalized
+        self.encode = encode or (lambda values: values)
+
+    def __repr__(self):
+        return 'VertexAttribute({!r}, {}, {})'.format(
+            self.name, self.dtype, self.components
+        )
+
+
+class VertexLayout(object):
+    """How the attributes of a vertex are interleaved into a single strided
+    buffer. Every attribute starts on a 4 byte boundary.
+
+    :param attributes: The `VertexAttribute`s of a vertex, in order
+    """
+    def __init__(self, attributes):
+        self.attributes = collections.OrderedDict(
+            (attribute.name, attribute) for attribute in attributes
+        )
+
+        offsets, offset = [], 0
+        for attribute in attributes:
+            offsets.append(offset)
+            offset = align(
+                offset + attribute.dtype.itemsize * attribute.components
+            )
+
+        self.dtype = np.dtype({
+            'names': [attribute.name for attribute in attributes],
+            'formats': [
+                (attribute.dtype, (attribute.components,))
+                for attribute in attributes
+            ],
+            'offsets': offsets,
+            'itemsize': offset
+        })
+
+    def __getitem__(self, name):
+        return self.attributes[name]
+
+    def __iter__(self):
+        return iter(self.attributes.values())
+
+    @property
+    def stride(self):
+        return self.dtype.itemsize
+
+    def offset(self, name):
+        """The offset in bytes of `name` from the start of a vertex"""
+        return self.dtype.fields[name][1]
+
+    def pack(self, **arrays):
+        """Interleave the attribute arrays, passed by name, into a buffer"""
+        count = len(next(iter(arrays.values())))
+        buffer = np.zeros(count, dtype=self.dtype)
+
+        for attribute in self:
+            buffer[attribute.name] = attribute.encode(arrays[attribute.name])
+
+        return buffer
+
+
+def align(offset, alignment=4):
+    return -(-offset // alignment) * alignment
+
+
+#: The attributes exactly as they are stored in the model, 56 bytes a vertex
+FLOAT_LAYOUT = VertexLayout([
+    VertexAttribute('position', np.float32, 3),
+    VertexAttribute('normal', np.float32, 3),
+    VertexAttribute('texcoord', np.float32, 2),
+    VertexAttribute('bone_ids', np.int16, 4),
+    VertexAttribute('bone_weights', np.float32, 4),
+])
+
+
+def compact_layout(half_floats=False, weight_type=np.uint8):
+    """A layout with octahedral normals, uint8 bone ids and normalized
+    integer weights, 32 bytes a vertex or 24 bytes with `half_floats`.
+
+    :param half_floats: Store positions and texcoords as float16, which
+        needs OpenGL 3.0 or ARB_half_float_vertex
+    :param weight_type: np.uint8 or np.uint16 for the bone weights
+    """
+    float_type = np.float16 if half_floats else np.float32
+
+    return VertexLayout([
+        VertexAttribute('position', float_type, 3),
+        VertexAttribute(
+            'normal', np.int16, 2, normalized=True, encode=octahedral_encode
+        ),
+        VertexAttribute('texcoord', float_type, 2),
+        VertexAttribute(
+            'bone_ids', np.uint8, 4,
+            encode=functools.partial(unsigned_ids, dtype=np.uint8)
+        ),
+        VertexAttribute(
+            'bone_weights', weight_type, 4, normalized=True,
+            encode=functools.partial(quantize_weights, dtype=weight_type)
+        ),
+    ])
@@ -0,0 +1,205 @@
+"""The keyframes of every bone of a model, packed together
+
+Instead of arrays for each bone, every bone's keyframes of a kind are
+concatenated into one array of times and one of values, with the keyframes
+of bone i between offsets[i] and offsets[i + 1] (like the rows of a CSR
+matrix). A whole skeleton is sampled at once, and each bone's `Keyframes`
+are just views of its slice.
+"""
+import numpy as np
+
+from .bone import frames
+from .keyframes import lerp
+
+
+class Tracks(object):
+    """A keyframe track for every bone, packed into contiguous arrays
+
+    :param times: The times of every track's keyframes, one track after the
+        other, each in increasing order
+    :param values: The value at each keyframe, a row each
+    :param offsets: Where each track starts in `times`, and where the last
+        one ends. Every track has at least one keyframe.
+    """
+    def __init__(self, times, values, offsets):
+        self.times = np.asarray(times, dtype=np.float32)
+        self.values = np.asarray(values, dtype=np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+
+        self.starts, self.ends = self.offsets[:-1], self.offsets[1:]
+        self.cursors = self.starts.copy()
+
+    @classmethod
+    def pack(cls, tracks):
+        """Pack the (times, values) of each track"""
+        if not tracks:
+            return cls([], np.empty((0, 3)), [0])
+
+        times, values = zip(*tracks)
+
+        return cls(
+            np.concatenate(times),
+            np.concatenate([
+                np.asarray(track_values, dtype=np.float32).reshape(
+                    len(track_times), -1
+                ) for track_times, track_values in tracks
+            ]),
+            np.cumsum([0] + list(map(len, times)))
+        )
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        """The times and values of a track, as views"""
+        track = slice(self.starts[index], self.ends[index])
+        return self.times[track], self.values[track]
+
+    @property
+    def max_time(self):
+        return float(self.times.max(initial=0.0))
+
+    def inside(self, cursors, t):
+        """Whether `t` is between the keyframe before each cursor and the
+        one at it
+        """
+        previous = self.times[np.maximum(cursors - 1, 0)]
+        current = self.times[np.minimum(cursors, len(self.times) - 1)]
+
+        after_previous = (cursors == self.starts) | (previous <= t)
+        before_current = (cursors == self.ends) | (t < current)
+
+        return after_previous & before_current
+
+    def search(self, t):
+        """Binary search every track at once
+
+        :param t: A time, or an array of times
+        :returns: The index of each track's first keyframe after each time,
+            shaped like `t` with an axis for the tracks added
+        """
+        t = np.asarray(t, dtype=np.float64)[..., np.newaxis]
+        shape = t.shape[:-1] + self.starts.shape
+        low = np.broadcast_to(self.starts, shape).copy()
+        high = np.broadcast_to(self.ends, shape).copy()
+
+        active = low < high
+        while active.any():
+            middle = (low + high) // 2
+            after = self.times[np.where(active, middle, 0)] > t
+
+            high = np.where(active & after, middle, high)
+            low = np.where(active & ~after, middle + 1, low)
+            active = low < high
+
+        return low
+
+    def index(self, t):
+        """The index of each track's first keyframe after `t`. Like
+        `Keyframes.index`, playing forwards only checks the current and next
+        keyframes.
+        """
+        cursors = self.cursors
+
+        if not self.inside(cursors, t).all():
+            cursors = np.minimum(cursors + 1, self.ends)
+            if not self.inside(cursors, t).all():
+                cursors = self.search(t)
+
+        self.cursors = cursors
+        return cursors
+
+    def interpolate(self, after, t):
+        t = np.asarray(t, dtype=np.float64)[..., np.newaxis]
+        a = np.maximum(after - 1, self.starts)
+        b = np.minimum(after, self.ends - 1)
+
+        # Before the first or after the last keyframe the segment is empty
+        span = self.times[b] - self.times[a]
+        factor = np.divide(
+            t - self.times[a], span,
+            out=np.zeros(span.shape), where=span > 0
+        )
+
+        return lerp(self.values[a], self.values[b], factor[..., np.newaxis])
+
+    def sample(self, t):
+        """Every track's value at `t`, as an array with a row per track"""
+        return self.interpolate(self.index(t), t)
+
+    def sample_at_times(self, times):
+        """Every track's value at each of an array of times
+
+        :returns: An array shaped like `times`, with axes for the tracks and
+            the value's components added
+        """
+        return self.interpolate(self.search(times), times)
+
+
+class Animation(object):
+    """The rotation and translation keyframes of every bone of a model
+
+    :param rotations: The rotation `Tracks`
+    :param translations: The translation `Tracks`
+    """
+    kinds = ('rotation', 'translation')
+
+    def __init__(self, rotations, translations):
+        self.rotations = rotations
+        self.translations = translations
+
+    @classmethod
+    def from_keyframes(cls, keyframes):
+        """Pack the keyframe columns of each bone, as deserialized by
+        `spec.KeyframeStruct`
+        """
+        keyframes = list(keyframes)
+
+        return cls(*(
+            Tracks.pack([frames(columns, kind) for columns in keyframes])
+            for kind in cls.kinds
+        ))
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Load the animation from the arrays made by `arrays`"""
+        return cls(*(
+            Tracks(*(
+                arrays['animation.{}.{}'.format(kind, name)]
+                for name in ('times', 'values', 'offsets')
+            )) for kind in cls.kinds
+        ))
+
+    def arrays(self):
+        """The packed arrays, to cache the animation with"""
+        return {
+            'animation.{}.{}'.format(kind, name): getattr(tracks, name)
+            for kind, tracks in zip(self.kinds, self.tracks)
+            for name in ('times', 'values', 'offsets')
+        }
+
+    @property
+    def tracks(self):
+        return self.rotations, self.translations
+
+    def __len__(self):
+        return len(self.rotations)
+
+    @property
+    def max_time(self):
+        return max(tracks.max_time for tracks in self.tracks)
+
+    def keyframes(self, index):
+        """The keyframe columns of a bone, as views, to create the bone
+        with
+        """
+        columns = {}
+        for kind, tracks in zip(self.kinds, self.tracks):
+            times, values = tracks[index]
+            columns[kind] = {'time': times, kind: values}
+
+        return columns
+
+    def sample(self, t):
+        """The rotation and translation of every bone at `t`"""
+        return self.rotations.sample(t), self.translations.sample(t)
@@ -5,6 +5,18 @@ from .. import matrix
 from .keyframes import Keyframes
 
 
+def frames(keyframes, name):
+    """The times and values of the keyframe columns called `name`, falling
+    back to a single identity frame when there are none.
+    """
+    columns = keyframes.get(name)
+
+    if columns is None or not len(columns['time']):
+        return [0.0], [(0, 0, 0)]
+
+    return columns['time'], columns[name]
+
+
 class Bone(object):
     parent_bone = None
 
@@ -20,19 +32,13 @@ class Bone(object):
         self.position = position
         self.children = []
 
-        self.rotation_keyframes = Keyframes([
-            (keyframe['time'], keyframe['rotation'])
-            for keyframe in keyframes.get('rotation') or [
-                dict(time=0.0, rotation=(0, 0, 0))
-            ]
-        ])
-
-        self.translation_keyframes = Keyframes([
-            (keyframe['time'], keyframe['translation'])
-            for keyframe in keyframes.get('translation') or [
-                dict(time=0.0, translation=(0, 0, 0))
-            ]
-        ])
+        self.rotation_keyframes = Keyframes(
+            *frames(keyframes, 'rotation')
+        )
+
+        self.translation_keyframes = Keyframes(
+            *frames(keyframes, 'translation')
+        )
 
     @reify
     def rotation_matrix(self):
@@ -0,0 +1,194 @@
+"""An on-disk cache of preprocessed models
+
+A cache file starts with a magic number and the length of a JSON header,
+followed by the header and the raw bytes of every array. Arrays are aligned
+to 64 bytes so they can be used straight from a read-only memory mapping.
+
+The header records the path, modification time, size and hash of the model
+the cache was made from, and the vertex layout of its buffers.
+"""
+import functools
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+
+MAGIC = b'MS3DCACHE'
+VERSION = 2
+ALIGNMENT = 64
+
+#: The magic number, the version and the length of the JSON header
+preamble = struct.Struct('<9sII')
+
+
+def align(offset, alignment=ALIGNMENT):
+    return -(-offset // alignment) * alignment
+
+
+def cache_path(model_path):
+    return model_path + '.cache'
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+
+    with open(path, 'rb') as fp:
+        for chunk in iter(functools.partial(fp.read, 1 << 20), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def source_key(model_path, layout):
+    stat = os.stat(model_path)
+
+    return {
+        'path': os.path.abspath(model_path),
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'layout': str(layout.dtype),
+    }
+
+
+def umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def is_valid(cached_key, model_path, layout):
+    """Whether a cache made with `cached_key` is valid for the model. Only
+    when the modification time changed is the model hashed, so a touched but
+    unchanged model keeps its cache.
+    """
+    key = source_key(model_path, layout)
+
+    if any(cached_key.get(name) != key[name] for name in (
+        'path', 'size', 'layout'
+    )):
+        return False
+
+    if cached_key.get('mtime') == key['mtime']:
+        return True
+
+    return cached_key.get('hash') == content_hash(model_path)
+
+
+def write(path, header, arrays):
+    """Write a cache file. The file is replaced atomically, so readers never
+    see it half written.
+
+    :param header: JSON serializable values
+    :param arrays: Mapping of name to numpy array
+    """
+    arrays = {
+        name: np.ascontiguousarray(array) for name, array in arrays.items()
+    }
+
+    sections, offset = {}, 0
+    for name, array in arrays.items():
+        sections[name] = {
+            'dtype': np.lib.format.dtype_to_descr(array.dtype),
+            'shape': array.shape,
+            'offset': offset,
+        }
+        offset = align(offset + array.nbytes)
+
+    raw_header = json.dumps(dict(header, arrays=sections)).encode('utf8')
+    start = align(preamble.size + len(raw_header))
+
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=name, dir=directory)
+
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(preamble.pack(MAGIC, VERSION, len(raw_header)))
+            fp.write(raw_header)
+
+            for name, array in arrays.items():
+                fp.seek(start + sections[name]['offset'])
+                fp.write(array.tobytes())
+
+            fp.truncate(start + offset)
+
+        # mkstemp only lets the owner read the file
+        os.chmod(temp_path, 0o666 & ~umask())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def read(path):
+    """Read a cache file, the arrays are views into a memory mapping of it
+
+    :returns: The header, and a mapping of name to array
+    """
+    with open(path, 'rb') as fp:
+        mapping = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, header_length = preamble.unpack_from(mapping)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('{} is not a version {} cache'.format(path, VERSION))
+
+    header = json.loads(
+        mapping[preamble.size:preamble.size + header_length].decode('utf8')
+    )
+    start = align(preamble.size + header_length)
+
+    arrays = {}
+    for name, section in header.pop('arrays').items():
+        shape = tuple(section['shape'])
+        arrays[name] = np.frombuffer(
+            mapping, np.lib.format.descr_to_dtype(section['dtype']),
+            int(np.prod(shape)),
+            start + section['offset']
+        ).reshape(shape)
+
+    return header, arrays
+
+
+def load(model_path, layout):
+    """Load the cache of a model
+
+    :returns: The header and arrays of the cache, or None when there isn't a
+        valid one
+    """
+    try:
+        header, arrays = read(cache_path(model_path))
+    except (OSError, ValueError, struct.error):
+        return None
+
+    key = header.get('key', {})
+    if not is_valid(key, model_path, layout):
+        return None
+
+    mtime = source_key(model_path, layout)['mtime']
+    if key.get('mtime') != mtime:
+        refresh(model_path, dict(header, key=dict(key, mtime=mtime)), arrays)
+
+    return header, arrays
+
+
+def refresh(model_path, header, arrays):
+    """Rewrite a cache that is still valid with an updated header, so a
+    touched model is only hashed once
+    """
+    try:
+        write(cache_path(model_path), header, arrays)
+    except OSError:
+        pass
+
+
+def save(model_path, layout, header, arrays):
+    """Save a cache for the model"""
+    key = dict(
+        source_key(model_path, layout), hash=content_hash(model_path)
+    )
+
+    write(cache_path(model_path), dict(header, key=key), arrays)
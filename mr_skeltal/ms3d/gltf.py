@@ -0,0 +1,311 @@
+"""Export models to binary glTF (.glb)
+
+Every array is written as its own tightly packed bufferView, aligned to 4
+bytes inside a single binary chunk, so loaders can use them straight from a
+memory mapping of the file. The groups of a model become the primitives of
+a single mesh, sharing one set of vertex attributes, its bones become a skin
+and its keyframes a single animation.
+"""
+import json
+import struct
+
+import numpy as np
+
+from .. import matrix, mesh
+from .model import bone_arrays
+
+
+MAGIC = b'glTF'
+VERSION = 2
+
+JSON_CHUNK = 0x4E4F534A
+BIN_CHUNK = 0x004E4942
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+COMPONENT_TYPES = {
+    np.dtype(np.int8): 5120,
+    np.dtype(np.uint8): 5121,
+    np.dtype(np.int16): 5122,
+    np.dtype(np.uint16): 5123,
+    np.dtype(np.uint32): 5125,
+    np.dtype(np.float32): 5126,
+}
+
+#: The accessor type of arrays by the shape of their elements
+ACCESSOR_TYPES = {
+    (): 'SCALAR',
+    (2,): 'VEC2',
+    (3,): 'VEC3',
+    (4,): 'VEC4',
+    (4, 4): 'MAT4',
+}
+
+
+class Builder(object):
+    """Collects the JSON document and binary chunk of a glb file"""
+    def __init__(self):
+        self.document = {
+            'asset': {'version': '2.0', 'generator': 'mr_skeltal'},
+        }
+        self.chunks = []
+        self.length = 0
+
+    def add(self, kind, item):
+        """Add an item to one of the document's lists
+
+        :returns: The index of the item
+        """
+        items = self.document.setdefault(kind, [])
+        items.append(item)
+
+        return len(items) - 1
+
+    def buffer_view(self, data, target=None):
+        padding = mesh.align(self.length) - self.length
+        self.chunks.append(b'\0' * padding + data)
+        self.length += padding + len(data)
+
+        view = {
+            'buffer': 0,
+            'byteOffset': self.length - len(data),
+            'byteLength': len(data),
+        }
+        if target is not None:
+            view['target'] = target
+
+        return self.add('bufferViews', view)
+
+    def accessor(self, array, target=None, bounds=False):
+        """Add an array as an accessor with a bufferView of its own
+
+        :param bounds: Whether to record the array's minimum and maximum,
+            positions and animation inputs need them
+        """
+        array = np.ascontiguousarray(array)
+
+        accessor = {
+            'bufferView': self.buffer_view(array.tobytes(), target),
+            'componentType': COMPONENT_TYPES[array.dtype],
+            'count': len(array),
+            'type': ACCESSOR_TYPES[array.shape[1:]],
+        }
+        if bounds:
+            accessor['min'] = np.atleast_1d(array.min(axis=0)).tolist()
+            accessor['max'] = np.atleast_1d(array.max(axis=0)).tolist()
+
+        return self.add('accessors', accessor)
+
+    def binary(self):
+        data = b''.join(self.chunks)
+        return data + b'\0' * (mesh.align(len(data)) - len(data))
+
+    def write(self, fp):
+        binary = self.binary()
+        self.document['buffers'] = [{'byteLength': len(binary)}]
+
+        document = json.dumps(self.document, separators=(',', ':'))
+        document = document.encode('utf8')
+        document += b' ' * (mesh.align(len(document)) - len(document))
+
+        fp.write(struct.pack(
+            '<4sII', MAGIC, VERSION, 12 + 8 + len(document) + 8 + len(binary)
+        ))
+        fp.write(struct.pack('<II', len(document), JSON_CHUNK))
+        fp.write(document)
+        fp.write(struct.pack('<II', len(binary), BIN_CHUNK))
+        fp.write(binary)
+
+
+def skin_attributes(bone_ids, bone_weights, bone_count):
+    """The JOINTS_0 and WEIGHTS_0 of vertices, dropping the bones the skin
+    shader ignores: everything from a vertex's first bone id that isn't a
+    bone. The weights are normalized, vertices without any bone follow the
+    first one.
+    """
+    valid = np.logical_and.accumulate(
+        (bone_ids >= 0) & (bone_ids < bone_count), axis=1
+    )
+
+    joints = np.where(valid, bone_ids, 0).astype(np.uint16)
+    weights = np.where(valid, bone_weights, 0.0)
+
+    total = weights.sum(axis=1, keepdims=True)
+    weights = np.where(total > 0, weights, [1.0, 0.0, 0.0, 0.0])
+    weights /= weights.sum(axis=1, keepdims=True)
+
+    return joints, weights.astype(np.float32)
+
+
+def add_mesh(builder, model):
+    """Add the model's groups as the primitives of a mesh, groups without
+    triangles are left out
+
+    :returns: The index of the mesh, or None when no group has triangles
+    """
+    groups = [group for group in model.groups if len(group.triangle_indices)]
+    if not groups:
+        return None
+
+    bases = np.cumsum([0] + [len(group.vertex_buffer) for group in groups])
+
+    def vertices(name):
+        return np.concatenate([getattr(group, name) for group in groups])
+
+    attributes = {
+        'POSITION': builder.accessor(
+            vertices('vertex_buffer'), ARRAY_BUFFER, bounds=True
+        ),
+        'NORMAL': builder.accessor(vertices('normal_buffer'), ARRAY_BUFFER),
+        'TEXCOORD_0': builder.accessor(
+            vertices('texcoord_buffer'), ARRAY_BUFFER
+        ),
+    }
+
+    if model.bones:
+        joints, weights = skin_attributes(
+            vertices('bone_id_buffer'), vertices('bone_weight_buffer'),
+            len(model.bones)
+        )
+        attributes['JOINTS_0'] = builder.accessor(joints, ARRAY_BUFFER)
+        attributes['WEIGHTS_0'] = builder.accessor(weights, ARRAY_BUFFER)
+
+    return builder.add('meshes', {'primitives': [
+        {
+            'attributes': attributes,
+            'indices': builder.accessor(
+                mesh.index_buffer(group.index_buffer.astype(np.int64) + base),
+                ELEMENT_ARRAY_BUFFER
+            ),
+            'material': model.materials.index(group.material),
+        } for group, base in zip(groups, bases)
+    ]})
+
+
+def add_materials(builder, model):
+    for material in model.materials:
+        builder.add('materials', {
+            'name': material.name,
+            'pbrMetallicRoughness': {
+                'baseColorFactor': list(material.diffuse),
+                'metallicFactor': 0.0,
+            },
+            'emissiveFactor': list(material.emissive[:3]),
+        })
+
+
+def add_skeleton(builder, arrays, names):
+    """Add a node for each bone in its bind pose, and the skin
+
+    :returns: The index of each bone's node, and of the skin
+    """
+    rest = matrix.euler_quaternions(arrays['bone_rotations'])
+    parents = arrays['bone_parents']
+
+    nodes = [
+        builder.add('nodes', {
+            'name': name,
+            'translation': position.tolist(),
+            'rotation': quaternion.tolist(),
+        }) for name, position, quaternion in zip(
+            names, arrays['bone_positions'], rest
+        )
+    ]
+
+    for index, parent in enumerate(parents):
+        if parent >= 0:
+            builder.document['nodes'][nodes[parent]].setdefault(
+                'children', []
+            ).append(nodes[index])
+
+    # glTF matrices are column major
+    inverse_bind_matrices = np.transpose(
+        arrays['inverse_bind_matrices'], (0, 2, 1)
+    ).astype(np.float32)
+
+    skin = builder.add('skins', {
+        'joints': nodes,
+        'inverseBindMatrices': builder.accessor(inverse_bind_matrices),
+    })
+
+    return nodes, skin
+
+
+def add_animation(builder, animation, arrays, nodes):
+    """Add the keyframes of every bone as a single animation. A keyframe
+    applies on top of the bone's bind pose, so they're combined into the
+    node's translation and rotation.
+
+    Rotation keyframes are interpolated as quaternions, where the viewer
+    interpolates their euler angles.
+    """
+    rest = matrix.euler_quaternions(arrays['bone_rotations'])
+    samplers, channels = [], []
+
+    def channel(node, path, time, values):
+        channels.append({
+            'sampler': len(samplers),
+            'target': {'node': node, 'path': path},
+        })
+        samplers.append({
+            'input': builder.accessor(time.astype(np.float32), bounds=True),
+            'output': builder.accessor(values.astype(np.float32)),
+            'interpolation': 'LINEAR',
+        })
+
+    for index, node in enumerate(nodes):
+        times, translations = animation.translations[index]
+        translations = matrix.quaternion_rotate(rest[index], translations)
+        channel(
+            node, 'translation', times,
+            arrays['bone_positions'][index] + translations
+        )
+
+        times, rotations = animation.rotations[index]
+        channel(
+            node, 'rotation', times,
+            matrix.continuous_quaternions(matrix.quaternion_multiply(
+                rest[index], matrix.euler_quaternions(rotations)
+            ))
+        )
+
+    builder.add('animations', {
+        'name': 'default', 'samplers': samplers, 'channels': channels
+    })
+
+
+def export(model, fp):
+    """Write a model as binary glTF
+
+    :param model: The `MS3DModel` to export
+    :param fp: A file opened for binary writing
+    """
+    builder = Builder()
+
+    add_materials(builder, model)
+    node = {'name': 'model'}
+    roots = []
+
+    mesh_index = add_mesh(builder, model)
+    if mesh_index is not None:
+        node['mesh'] = mesh_index
+
+    if model.bones:
+        names = list(model.bones)
+        arrays = bone_arrays(model.bones.values(), names)
+
+        nodes, node['skin'] = add_skeleton(builder, arrays, names)
+        add_animation(builder, model.animation, arrays, nodes)
+
+        roots = [
+            bone for bone, parent in zip(nodes, arrays['bone_parents'])
+            if parent < 0
+        ]
+
+    builder.document['scene'] = 0
+    builder.document['scenes'] = [
+        {'nodes': [builder.add('nodes', node)] + roots}
+    ]
+
+    builder.write(fp)
@@ -1,51 +1,121 @@
 import numpy as np
 
 from ..decorator import reify
+from .. import mesh
+from .triangle import Triangle
+from .views import Views
 
 
 class Group(object):
-    def __init__(self, name, triangles, material):
+    """A set of triangles sharing a material. The render buffers are gathered
+    from the arrays of the `model` the group belongs to, with the identical
+    corners of its triangles welded into a single vertex.
+
+    :param name: The name of the group
+    :param triangle_indices: The indices of the group's triangles in the model
+    :param material: The `Material` the group is drawn with
+    :param model: The `MS3DModel` the group belongs to
+    """
+    def __init__(self, name, triangle_indices, material, model):
         self.name = name
-        self.triangles = triangles
+        self.triangle_indices = np.asarray(triangle_indices, dtype=np.intp)
         self.material = material
+        self.model = model
+
+    @property
+    def triangles(self):
+        return Views(Triangle, self.model, self.triangle_indices)
+
+    def optimize_vertex_cache(self, cache_size=16):
+        """Reorder the group's triangles to make better use of the GPU's
+        post-transform vertex cache, see `mesh.Tipsify`. The buffers are
+        rebuilt in the new order.
+
+        :returns: The ACMR of the index buffer before and after
+        """
+        triangles = self.index_buffer.reshape(-1, 3)
+        before = mesh.acmr(triangles, cache_size)
+        order = mesh.tipsify(triangles, len(self.vertex_buffer), cache_size)
+
+        self.triangle_indices = self.triangle_indices[order]
+        for name, value in vars(Group).items():
+            if isinstance(value, reify):
+                self.__dict__.pop(name, None)
+
+        return before, mesh.acmr(self.index_buffer, cache_size)
 
     @reify
-    def vertex_buffer(self):
-        vertices = []
-        for triangle in self.triangles:
-            for vertex in triangle.vertices:
-                vertices.append(vertex.coords)
+    def corner_vertex_indices(self):
+        """The model vertex at every corner of every triangle in the group"""
+        corners = self.model.triangle_indices[self.triangle_indices]
+        return corners.reshape(-1).astype(np.intp)
 
-        return np.array(vertices, dtype=np.float32)
+    @reify
+    def corner_normals(self):
+        return self.model.normals[self.triangle_indices].reshape(-1, 3)
 
     @reify
-    def bone_weight_buffer(self):
-        bone_weights = []
-        for triangle in self.triangles:
-            for vertex in triangle.vertices:
-                bone_weights.append(vertex.bone_weights)
+    def corner_texcoords(self):
+        return self.model.texcoords[self.triangle_indices].reshape(-1, 2)
+
+    @reify
+    def welded(self):
+        """The first corner of each vertex, and the vertex of each corner"""
+        vertex_indices = self.corner_vertex_indices
 
-        return np.array(bone_weights, dtype=np.float32)
+        return mesh.weld(
+            self.model.positions[vertex_indices],
+            self.corner_normals,
+            self.corner_texcoords,
+            self.model.bone_ids[vertex_indices],
+            self.model.bone_weights[vertex_indices]
+        )
 
     @reify
-    def bone_id_buffer(self):
-        bone_ids = []
-        for triangle in self.triangles:
-            for vertex in triangle.vertices:
-                bone_ids.append(vertex.bone_ids)
+    def vertex_indices(self):
+        """The model vertex of each of the group's vertices"""
+        corners, _ = self.welded
+        return self.corner_vertex_indices[corners]
 
-        return np.array(bone_ids, dtype=np.int16)
+    @reify
+    def index_buffer(self):
+        _, indices = self.welded
+        return mesh.index_buffer(indices)
+
+    @reify
+    def vertex_data(self):
+        """The group's vertices interleaved into a single buffer, packed
+        with the model's `mesh.VertexLayout`
+        """
+        corners, _ = self.welded
+        vertex_indices = self.vertex_indices
+
+        return self.model.layout.pack(
+            position=self.model.positions[vertex_indices],
+            normal=self.corner_normals[corners],
+            texcoord=self.corner_texcoords[corners],
+            bone_ids=self.model.bone_ids[vertex_indices],
+            bone_weights=self.model.bone_weights[vertex_indices]
+        )
+
+    @reify
+    def vertex_buffer(self):
+        return self.model.positions[self.vertex_indices]
+
+    @reify
+    def bone_weight_buffer(self):
+        return self.model.bone_weights[self.vertex_indices]
+
+    @reify
+    def bone_id_buffer(self):
+        return self.model.bone_ids[self.vertex_indices]
 
     @reify
     def normal_buffer(self):
-        return np.array([
-            triangle.normals
-            for triangle in self.triangles
-        ], dtype=np.float32)
+        corners, _ = self.welded
+        return self.corner_normals[corners]
 
     @reify
     def texcoord_buffer(self):
-        return np.array([
-            triangle.texcoords
-            for triangle in self.triangles
-        ], dtype=np.float32)
+        corners, _ = self.welded
+        return self.corner_texcoords[corners]
@@ -1,8 +1,9 @@
 from collections import namedtuple
-import operator
 
 import numpy as np
 
+from ..decorator import reify
+
 
 Frame = namedtuple('Frame', ['time', 'value'])
 
@@ -12,25 +13,74 @@ def lerp(s, e, t):
 
 
 class Keyframes(object):
-    def __init__(self, frames):
-        self.frames = [Frame(time, value) for time, value in frames]
+    """A track of keyframes, interpolated linearly between them
+
+    Sampling remembers the keyframe it ended up at, so playing the track
+    forwards only checks the current and next keyframe, and only a jump
+    searches the times.
+
+    :param times: The time of each keyframe, in increasing order
+    :param values: The value at each keyframe
+    """
+    def __init__(self, times, values):
+        self.times = np.asarray(times, dtype=np.float32)
+        self.values = np.asarray(values, dtype=np.float32).reshape(
+            len(self.times), -1
+        )
+        self.max_time = float(self.times.max())
+        self.cursor = 0
+
+    @reify
+    def bounds(self):
+        # The segment before each keyframe and after the last, segment i
+        # starts at bounds[i] and ends before bounds[i + 1]
+        return [-np.inf] + self.times.tolist() + [np.inf]
 
     @property
-    def max_time(self):
-        return max(map(operator.attrgetter('time'), self.frames))
+    def frames(self):
+        return [Frame(*frame) for frame in zip(self.times, self.values)]
+
+    def index(self, t):
+        """The number of keyframes at or before `t`"""
+        bounds, i = self.bounds, self.cursor
+
+        if not bounds[i] <= t < bounds[i + 1]:
+            i += 1
+            if not bounds[i] <= t < bounds[i + 1]:
+                i = int(self.times.searchsorted(t, 'right'))
+
+        self.cursor = i
+        return i
 
     def frame_at_time(self, t):
-        t = np.clip(t, 0.0, self.max_time)
+        i = self.index(t)
+
+        if i == 0:
+            return self.values[0]
+
+        if i == len(self.times):
+            return self.values[-1]
+
+        a, b = self.times[i - 1:i + 1]
+        return lerp(self.values[i - 1], self.values[i], (t - a) / (b - a))
+
+    def frame_at_times(self, times):
+        """Sample the track at an array of times at once
 
-        it = iter(self.frames)
-        a = next(it)
+        :returns: An array of the values, shaped like `times` with the
+            value's components added as the last axis
+        """
+        times = np.asarray(times, dtype=np.float64)
+        last = len(self.times) - 1
 
-        if t < a.time:
-            return a.value
+        i = self.times.searchsorted(times, 'right')
+        a, b = np.clip(i - 1, 0, last), np.clip(i, 0, last)
 
-        for b in it:
-            if a.time <= t < b.time:
-                return lerp(a.value, b.value, (t - a.time) / (b.time - a.time))
-            a = b
+        # Before the first or after the last keyframe the segment is empty
+        span = self.times[b] - self.times[a]
+        factor = np.divide(
+            times - self.times[a], span,
+            out=np.zeros_like(times), where=span > 0
+        )
 
-        return a.value
+        return lerp(self.values[a], self.values[b], factor[..., np.newaxis])
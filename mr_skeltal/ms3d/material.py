@@ -1,5 +1,4 @@
 from ..decorator import reify
-from .. import texture
 
 class Material(object):
 
@@ -19,12 +18,26 @@ class Material(object):
         self._texture = texture
         self._alphamap = alphamap
 
+    @property
+    def fields(self):
+        """The arguments to create the material with"""
+        return (
+            self.name,
+            self.ambient, self.diffuse, self.specular, self.emissive,
+            self.shininess, self.transparency,
+            self._texture, self._alphamap
+        )
+
     @reify
     def texture(self):
+        from .. import texture
+
         # Load the models texture, or, if the texture name is empty,
         # Load the test UV grid
         return texture.load(self._texture or 'textures/uv.png')
 
     @reify
     def alphamap(self):
+        from .. import texture
+
         return texture.load(self._alphamap)
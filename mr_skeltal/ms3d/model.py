@@ -1,67 +1,166 @@
 from collections import OrderedDict as odict
+import mmap
 from operator import itemgetter
 
 import numpy as np
 
-from .. import texture
+from .. import destruct, mesh
 from ..decorator import reify
+from .animation import Animation
+from .skeleton import BakedAnimation, Skeleton
+from .views import Views
+from . import cache as model_cache
 from . import (
     Bone, Triangle, Group, Vertex, Material,
-    MS3DSpec,
-    SkinShader, SimpleShader
+    MS3DSpec
 )
 
 
 file_spec = MS3DSpec()
 
+#: The group arrays stored in the cache
+GROUP_ARRAYS = (
+    'triangle_indices', 'vertex_indices', 'index_buffer', 'vertex_data'
+)
+
+
+def bone_arrays(bones, names):
+    """The arrays to cache a model's bones with, the hierarchy as the index
+    of each bone's parent and the bind pose. The keyframes are kept by the
+    model's `Animation`.
+    """
+    bones = list(bones)
+    arrays = {
+        'bone_parents': np.array([
+            names.index(bone.parent_name) if bone.parent_name else -1
+            for bone in bones
+        ], dtype=np.int32),
+        'bone_rotations': np.array(
+            [bone.rotation for bone in bones], dtype=np.float32
+        ).reshape(-1, 3),
+        'bone_positions': np.array(
+            [bone.position for bone in bones], dtype=np.float32
+        ).reshape(-1, 3),
+        'inverse_bind_matrices': np.array(
+            [bone.inverse_matrix for bone in bones]
+        ).reshape(-1, 4, 4),
+    }
+
+    return arrays
+
 
-def unpack(data, indices):
-    return [data[index] for index in indices]
+def read_model(model_path):
+    # Decode straight from a read-only mapping of the file, the arrays
+    # in the result are views into it, so the pages are shared through the
+    # page cache instead of being copied into every process.
+    with open(model_path, 'rb') as fp:
+        mapping = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return file_spec.deserialize(destruct.Buffer(mapping))
 
 
 class MS3DModel(object):
-    def __init__(self, model_path):
-        with open(model_path, 'rb') as fp:
-            data = file_spec.deserialize(fp)
+    """A model loaded from an MS3D file
 
-        self.animation_fps = data['animation_fps']
-        self.total_frames = data['total_frames']
-        self.current_time = data['current_time']
+    :param model_path: The path of the model
+    :param layout: The `mesh.VertexLayout` to pack the group buffers with
+    :param cache: Load the model from the cache next to it when it's valid,
+        and otherwise create one, see `cache`
+
+    :ivar pose_cache: A `skeleton.PoseCache` to share poses with other
+        models through, or None
+    :ivar baked: The `skeleton.BakedAnimation` to sample poses from instead
+        of the keyframes, or None, see `bake`
+    """
+    pose_cache = None
+    baked = None
+
+    def __init__(self, model_path, layout=mesh.FLOAT_LAYOUT, cache=False):
+        self.setup(layout)
+
+        cached = model_cache.load(model_path, layout) if cache else None
+        if cached is not None:
+            self.load_cache(*cached)
+            return
+
+        self.load_data(read_model(model_path))
+        if cache:
+            self.save_cache(model_path)
+
+    @classmethod
+    def from_cache_contents(cls, header, arrays, layout=mesh.FLOAT_LAYOUT):
+        """Create a model from the contents of a cache, see
+        `cache_contents`
+        """
+        model = cls.__new__(cls)
+        model.setup(layout)
+        model.load_cache(header, arrays)
+
+        return model
+
+    def setup(self, layout):
+        self.layout = layout
         self.bones = odict()
-        self.vertices = []
-        self.triangles = []
         self.materials = []
         self.groups = []
         self._timestamp = 0.0
 
-        self.bones.update((name, Bone(*bone)) for name, bone in zip(
-            map(itemgetter('name'), data['joints']),
-            map(itemgetter(
-                'name', 'parent_name', 'rotation', 'position', 'keyframes'
-            ), data['joints'])
-        ))
-
-        for bone in self.bones.values():
-            if not bone.parent_name:
-                continue
+    def load_data(self, data):
+        """Build the model from the deserialized MS3D file"""
+        self.animation_fps = data['animation_fps']
+        self.total_frames = data['total_frames']
+        self.current_time = data['current_time']
 
-            bone.parent_bone = self.bones[bone.parent_name]
-            bone.parent_bone.children.append(bone)
+        joints = data['joints']
+        self.animation = Animation.from_keyframes(
+            map(itemgetter('keyframes'), joints)
+        )
 
-        self.vertices.extend(Vertex(
-            vertex,
-            list(weights) + [1.0 - sum(weights)], [bone_id] + list(bone_ids)
-        ) for (vertex, bone_id), (weights, bone_ids) in zip(
-            map(itemgetter('vertex', 'bone_id'), data['vertices']),
-            map(itemgetter('weights', 'bone_ids'), data['vertices_ex'])
+        # The bones' keyframes are views of the animation
+        self.bones.update((name, Bone(
+            name, parent_name, rotation, position,
+            self.animation.keyframes(index)
+        )) for index, (name, parent_name, rotation, position) in enumerate(
+            map(itemgetter('name', 'parent_name', 'rotation', 'position'),
+                joints)
         ))
+        self.link_bones()
 
-        self.triangles.extend(Triangle(
-            unpack(self.vertices, indices), normals, list(zip(s, t))
-        ) for indices, normals, s, t in map(
-            itemgetter('vertex_indices', 'vertex_normals', 's', 't'),
-            data['triangles']
-        ))
+        vertices, vertices_ex = data['vertices'], data['vertices_ex']
+        if vertices_ex is None:
+            # Older files don't have extra weights, each vertex follows just
+            # its own bone
+            count = len(vertices['bone_id'])
+            vertices_ex = {
+                'weights': np.tile([1.0, 0.0, 0.0], (count, 1)),
+                'bone_ids': np.full((count, 3), -1)
+            }
+
+        # The model is kept as arrays of vertex and triangle attributes, the
+        # groups gather their render buffers from them
+        weights = vertices_ex['weights']
+        self.positions = np.ascontiguousarray(
+            vertices['vertex'], dtype=np.float32
+        )
+        self.bone_weights = np.column_stack([
+            weights, 1.0 - weights.sum(axis=1)
+        ]).astype(np.float32)
+        self.bone_ids = np.column_stack([
+            vertices['bone_id'], vertices_ex['bone_ids']
+        ]).astype(np.int16)
+
+        triangles = data['triangles']
+        # The indices keep the file's compact type, they're only widened
+        # where they're used to index
+        self.triangle_indices = np.ascontiguousarray(
+            triangles['vertex_indices']
+        )
+        self.normals = np.ascontiguousarray(
+            triangles['vertex_normals'], dtype=np.float32
+        )
+        self.texcoords = np.stack(
+            [triangles['s'], triangles['t']], axis=-1
+        ).astype(np.float32)
 
         self.materials.extend(Material(*mat) for mat in map(itemgetter(
             'name', 'ambient', 'diffuse', 'specular', 'emissive',
@@ -69,40 +168,177 @@ class MS3DModel(object):
         ), data['materials']))
 
         self.groups.extend(Group(
-            name, unpack(self.triangles, indices),
-            self.materials[mat_index]
+            name, indices, self.materials[mat_index], self
         ) for name, indices, mat_index in map(
             itemgetter('name', 'triangle_indices', 'material_index'),
             data['groups']
         ))
 
-        self.shader = (
-            SkinShader(len(self.bones)) if self.bones else SimpleShader()
+    def link_bones(self):
+        for bone in self.bones.values():
+            if not bone.parent_name:
+                continue
+
+            bone.parent_bone = self.bones[bone.parent_name]
+            bone.parent_bone.children.append(bone)
+
+    def cache_contents(self):
+        """The header and arrays to cache the model with, the group buffers
+        are stored ready to upload.
+        """
+        names = list(self.bones)
+        header = {
+            'animation_fps': float(self.animation_fps),
+            'total_frames': int(self.total_frames),
+            'current_time': float(self.current_time),
+            'bones': names,
+            'materials': [material.fields for material in self.materials],
+            'groups': [
+                [group.name, self.materials.index(group.material)]
+                for group in self.groups
+            ],
+        }
+
+        arrays = {
+            name: getattr(self, name) for name in (
+                'positions', 'bone_weights', 'bone_ids',
+                'triangle_indices', 'normals', 'texcoords'
+            )
+        }
+        arrays.update(bone_arrays(self.bones.values(), names))
+        arrays.update(self.animation.arrays())
+
+        for index, group in enumerate(self.groups):
+            for name in GROUP_ARRAYS:
+                arrays['groups.{}.{}'.format(index, name)] = getattr(
+                    group, name
+                )
+
+        return header, arrays
+
+    def save_cache(self, model_path):
+        # A model that can't be cached still loads
+        try:
+            model_cache.save(
+                model_path, self.layout, *self.cache_contents()
+            )
+        except OSError:
+            pass
+
+    def load_cache(self, header, arrays):
+        """Build the model from the contents of its cache"""
+        self.animation_fps = header['animation_fps']
+        self.total_frames = header['total_frames']
+        self.current_time = header['current_time']
+
+        for name in (
+            'positions', 'bone_weights', 'bone_ids',
+            'triangle_indices', 'normals', 'texcoords'
+        ):
+            setattr(self, name, arrays[name])
+
+        self.animation = Animation.from_arrays(arrays)
+
+        names = header['bones']
+        parents = arrays['bone_parents']
+        for index, name in enumerate(names):
+            bone = Bone(
+                name, names[parents[index]] if parents[index] >= 0 else '',
+                arrays['bone_rotations'][index],
+                arrays['bone_positions'][index],
+                self.animation.keyframes(index)
+            )
+            bone.inverse_matrix = arrays['inverse_bind_matrices'][index]
+            self.bones[name] = bone
+        self.link_bones()
+
+        self.materials.extend(
+            Material(*fields) for fields in header['materials']
         )
 
+        for index, (name, material) in enumerate(header['groups']):
+            group = Group(
+                name, arrays['groups.{}.triangle_indices'.format(index)],
+                self.materials[material], self
+            )
+
+            # Skip building the buffers, the cache has them ready
+            for array in GROUP_ARRAYS:
+                setattr(group, array, arrays['groups.{}.{}'.format(
+                    index, array
+                )])
+
+            self.groups.append(group)
+
+    @reify
+    def shader(self):
+        # Imported here, so models can be loaded without OpenGL
+        from .shaders import SkinShader, SimpleShader
+
+        return SkinShader(len(self.bones)) if self.bones else SimpleShader()
+
+    @property
+    def vertices(self):
+        return Views(Vertex, self, range(len(self.positions)))
+
+    @property
+    def triangles(self):
+        return Views(Triangle, self, range(len(self.triangle_indices)))
+
     @reify
     def matrix(self):
         return np.identity(4, dtype=np.float32)
 
+    @reify
+    def skeleton(self):
+        return Skeleton.from_arrays(
+            bone_arrays(self.bones.values(), list(self.bones)),
+            self.animation
+        )
+
+    def bake(self, rate=None, compact=False):
+        """Sample poses from a table of the animation evaluated `rate` times
+        a second, by default the model's frame rate
+
+        :param compact: Store translations and quaternions instead of
+            matrices
+        :returns: The `skeleton.BakedAnimation`, which can be saved and
+            assigned to `baked` of other instances of the model
+        """
+        self.baked = self.skeleton.bake(
+            rate or self.animation_fps, self.animation_length, compact
+        )
+
+        return self.baked
+
+    def load_baked(self, path):
+        """Sample poses from a table saved with `BakedAnimation.save`"""
+        baked = BakedAnimation.load(path)
+        if baked.key != self.skeleton.key:
+            raise ValueError(
+                '{} was baked from a different skeleton'.format(path)
+            )
+
+        self.baked = baked
+
     @property
     def bone_matrices(self):
-        return np.array([
-            np.dot(bone.matrix_at_t(self.timestamp), bone.inverse_matrix)
-            for bone in self.bones.values()
-        ], dtype=np.float32)
+        if self.baked is not None:
+            return self.baked.skinning_matrices(self.timestamp)
+
+        if self.pose_cache is not None:
+            return self.pose_cache.skinning_matrices(
+                self.skeleton, self.timestamp
+            )
+
+        return self.skeleton.skinning_matrices(self.timestamp)
 
     def render(self, view_matrix, projection_matrix):
         self.shader.render(self, view_matrix, projection_matrix)
 
-    @property
+    @reify
     def animation_length(self):
-        return max([
-            max(
-                bone.rotation_keyframes.max_time,
-                bone.translation_keyframes.max_time
-            )
-            for bone in self.bones.values()
-        ], default=0.0)
+        return self.animation.max_time
 
     @property
     def timestamp(self):
@@ -116,8 +352,10 @@ class MS3DModel(object):
     @reify
     def bbox(self):
         """Return the bbox for the model's initial pose"""
-        vertices = np.array([
-            vertex.coords for vertex in self.vertices
-        ], dtype=np.float32)
+        if len(self.positions) == 0:
+            return []
 
-        return list(zip(*[(min(v), max(v)) for v in vertices.T]))
+        return [
+            tuple(self.positions.min(axis=0)),
+            tuple(self.positions.max(axis=0))
+        ]
@@ -0,0 +1,163 @@
+"""Models shared between processes
+
+A `ModelRegistry` loads each model once into a `cache` file in shared memory
+(``/dev/shm`` where there is one), and every process using the model maps
+the file, so they all share the same read-only pages. Models are reference
+counted, and their file is removed when the last process releases them.
+"""
+import os
+import tempfile
+import time
+
+from .. import mesh
+from . import cache
+from .model import MS3DModel
+
+
+#: Returned by `ModelRegistry.attach` while another process loads the model
+LOADING = object()
+
+
+def shared_directory():
+    """The directory to keep shared models in, memory backed if possible"""
+    if os.path.isdir('/dev/shm'):
+        return '/dev/shm'
+
+    return tempfile.gettempdir()
+
+
+class SharedModel(object):
+    """A model acquired from a `ModelRegistry`, use it as a context manager
+    or call `release` when done with it.
+
+    :ivar model: The `MS3DModel`, its arrays are read-only views of the
+        shared memory
+    """
+    def __init__(self, registry, key, path, layout):
+        self.registry = registry
+        self.key = key
+        self.model = MS3DModel.from_cache_contents(
+            *cache.read(path), layout=layout
+        )
+
+    def release(self):
+        if self.model is None:
+            return
+
+        # The mapping stays valid for anything still holding the arrays
+        self.model = None
+        self.registry.release(self.key)
+
+    def __enter__(self):
+        return self.model
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class ModelRegistry(object):
+    """Shares models between processes. The registry keeps its state in a
+    `multiprocessing.Manager`, so it can be passed to other processes.
+
+    :param manager: A started `multiprocessing.managers.SyncManager`
+    :param directory: Where to keep the shared models
+    """
+    #: How long to wait between checks on a model another process is loading
+    poll_interval = 0.01
+
+    def __init__(self, manager, directory=None):
+        self.directory = directory or shared_directory()
+        self.entries = manager.dict()
+        self.lock = manager.Lock()
+
+    def key(self, model_path, layout):
+        return '{}:{}'.format(os.path.abspath(model_path), layout.dtype)
+
+    def share(self, model_path, layout):
+        """Load a model into a new shared file
+
+        :returns: The path of the file
+        """
+        fd, path = tempfile.mkstemp(
+            prefix='mr_skeltal-', suffix='.ms3d.cache', dir=self.directory
+        )
+        os.close(fd)
+
+        cache.write(path, *MS3DModel(model_path, layout).cache_contents())
+
+        return path
+
+    def acquire(self, model_path, layout=mesh.FLOAT_LAYOUT):
+        """Attach to the shared copy of a model, loading it when no process
+        has it yet. Only processes acquiring the same model wait for it to
+        load.
+
+        :returns: A `SharedModel`
+        """
+        key = self.key(model_path, layout)
+
+        path = self.attach(key)
+        while path is LOADING:
+            time.sleep(self.poll_interval)
+            path = self.attach(key)
+
+        if path is None:
+            path = self.load(key, model_path, layout)
+
+        return SharedModel(self, key, path, layout)
+
+    def attach(self, key):
+        """Take a reference to a loaded model, or claim loading it
+
+        :returns: The path of the model's file, None when the caller claimed
+            loading it, or `LOADING` when another process is loading it
+        """
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (None, 0)
+                return None
+
+            path, references = self.entries[key]
+            if path is None:
+                return LOADING
+
+            self.entries[key] = (path, references + 1)
+            return path
+
+    def load(self, key, model_path, layout):
+        """Load a model claimed with `attach`, without holding the lock, and
+        publish its file
+
+        :returns: The path of the file
+        """
+        try:
+            path = self.share(model_path, layout)
+        except BaseException:
+            # Let another process try
+            with self.lock:
+                del self.entries[key]
+            raise
+
+        with self.lock:
+            self.entries[key] = (path, 1)
+
+        return path
+
+    def release(self, key):
+        """Drop a reference to a model, removing its file with the last one"""
+        with self.lock:
+            path, references = self.entries[key]
+
+            if references > 1:
+                self.entries[key] = (path, references - 1)
+                return
+
+            del self.entries[key]
+
+        os.remove(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
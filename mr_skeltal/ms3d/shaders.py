@@ -3,6 +3,7 @@
 Shaders customized to work with MS3D Models (specifically, groups, and boneless
 models)
 """
+import ctypes
 from textwrap import dedent
 
 import numpy as np
@@ -13,17 +14,59 @@ from OpenGL.GL import (
     glVertexAttribPointer,
     glUniform1i, glUniformMatrix4fv,
     glBindTexture,
-    glDrawArrays
+    glDrawElements
 )
 from OpenGL.GL import (
     GL_FALSE, GL_TRUE,
-    GL_FLOAT, GL_SHORT,
+    GL_FLOAT, GL_HALF_FLOAT,
+    GL_BYTE, GL_UNSIGNED_BYTE,
+    GL_SHORT, GL_UNSIGNED_SHORT,
+    GL_UNSIGNED_INT,
     GL_TRIANGLES, GL_TEXTURE_2D
 )
 
 from ..shader import Uniform, Attribute, Shader
 
 
+INDEX_TYPES = {
+    np.dtype(np.uint16): GL_UNSIGNED_SHORT,
+    np.dtype(np.uint32): GL_UNSIGNED_INT,
+}
+
+
+GL_TYPES = {
+    np.dtype(np.float32): GL_FLOAT,
+    np.dtype(np.float16): GL_HALF_FLOAT,
+    np.dtype(np.int8): GL_BYTE,
+    np.dtype(np.uint8): GL_UNSIGNED_BYTE,
+    np.dtype(np.int16): GL_SHORT,
+    np.dtype(np.uint16): GL_UNSIGNED_SHORT,
+}
+
+
+def bind_vertex_data(shader, group):
+    """Point the shader's attributes at the group's interleaved vertices"""
+    layout = group.model.layout
+    address = group.vertex_data.ctypes.data
+
+    for location_name, name in shader.layout_attributes:
+        attribute = layout[name]
+
+        glVertexAttribPointer(
+            getattr(shader, location_name),
+            attribute.components, GL_TYPES[attribute.dtype],
+            GL_TRUE if attribute.normalized else GL_FALSE,
+            layout.stride, ctypes.c_void_p(address + layout.offset(name))
+        )
+
+
+def draw_group(group):
+    glDrawElements(
+        GL_TRIANGLES, group.index_buffer.size,
+        INDEX_TYPES[group.index_buffer.dtype], group.index_buffer
+    )
+
+
 class SkinShader(Shader):
     vertex_shader = dedent("""\
         #version 120
@@ -45,7 +88,8 @@ class SkinShader(Shader):
 
             ivec4 boneIds = ivec4(aBoneIds);
             for(int idx = 0; idx < 4; idx++) {{
-                if(boneIds.x == -1) continue;
+                // Unused slots are -1, or the largest value of unsigned ids
+                if(boneIds.x < 0 || boneIds.x >= {num_joints}) continue;
                 newVertex +=
                     uBoneMatrices[boneIds.x] *
                     vec4(aVertex, 1.0) *
@@ -76,6 +120,14 @@ class SkinShader(Shader):
     bone_ids = Attribute('aBoneIds')
     bone_weights = Attribute('aBoneWeights')
 
+    #: The attribute locations and the layout attributes they're fed from
+    layout_attributes = [
+        ('vertices', 'position'),
+        ('texcoords', 'texcoord'),
+        ('bone_ids', 'bone_ids'),
+        ('bone_weights', 'bone_weights'),
+    ]
+
     def __init__(self, num_joints):
         self.vertex_shader = self.vertex_shader.format(num_joints=num_joints)
         super().__init__()
@@ -103,21 +155,8 @@ class SkinShader(Shader):
             glBindTexture(GL_TEXTURE_2D, group.material.texture)
             glUniform1i(self.texture, 0)
 
-            glVertexAttribPointer(
-                self.bone_ids, 4, GL_SHORT, GL_FALSE, 0, group.bone_id_buffer
-            )
-            glVertexAttribPointer(
-                self.bone_weights, 4, GL_FLOAT, GL_FALSE, 0,
-                group.bone_weight_buffer
-            )
-            glVertexAttribPointer(
-                self.vertices, 3, GL_FLOAT, GL_FALSE, 0, group.vertex_buffer
-            )
-            glVertexAttribPointer(
-                self.texcoords, 2, GL_FLOAT, GL_FALSE, 0, group.texcoord_buffer
-            )
-
-            glDrawArrays(GL_TRIANGLES, 0, len(group.vertex_buffer))
+            bind_vertex_data(self, group)
+            draw_group(group)
 
         glDisableVertexAttribArray(self.bone_weights)
         glDisableVertexAttribArray(self.bone_ids)
@@ -157,6 +196,11 @@ class SimpleShader(Shader):
     vertices = Attribute('aVertex')
     texcoords = Attribute('aTexCoord')
 
+    layout_attributes = [
+        ('vertices', 'position'),
+        ('texcoords', 'texcoord'),
+    ]
+
     def render(self, model, view_matrix, projection_matrix):
         glUseProgram(self.program)
 
@@ -174,14 +218,9 @@ class SimpleShader(Shader):
         for group in model.groups:
             glBindTexture(GL_TEXTURE_2D, group.material.texture)
             glUniform1i(self.texture, 0)
-            glVertexAttribPointer(
-                self.vertices, 3, GL_FLOAT, GL_FALSE, 0, group.vertex_buffer
-            )
-            glVertexAttribPointer(
-                self.texcoords, 2, GL_FLOAT, GL_FALSE, 0, group.texcoord_buffer
-            )
-
-            glDrawArrays(GL_TRIANGLES, 0, len(group.vertex_buffer))
+
+            bind_vertex_data(self, group)
+            draw_group(group)
 
         glDisableVertexAttribArray(self.vertices)
         glDisableVertexAttribArray(self.texcoords)
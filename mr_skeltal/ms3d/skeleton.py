@@ -0,0 +1,297 @@
+"""Poses of a whole skeleton at once
+
+A `Skeleton` keeps a model's bones as arrays in the order of the model's
+bones, with the index of each bone's parent. The bones are grouped into
+levels by their depth, so the world matrices of a pose are computed a level
+at a time, each with a single batched matrix multiplication.
+
+A `BakedAnimation` samples the poses from a table evaluated up front, and a
+`PoseCache` shares the poses of identical skeletons between models, so a
+crowd of instances playing the same clip evaluates each pose once.
+"""
+from collections import OrderedDict as odict
+import hashlib
+
+import numpy as np
+
+from .. import matrix
+from ..decorator import reify
+from . import cache
+from .keyframes import lerp
+
+
+def depths(parents):
+    """The depth of each bone in the hierarchy, roots having depth 0"""
+    has_parent = parents >= 0
+    depth = np.zeros(len(parents), dtype=np.intp)
+
+    # Each pass settles the next level
+    for _ in range(len(parents)):
+        deeper = np.where(has_parent, depth[parents] + 1, 0)
+        if np.array_equal(deeper, depth):
+            break
+        depth = deeper
+
+    return depth
+
+
+class Skeleton(object):
+    """The bones of a model as arrays
+
+    :param parents: The index of each bone's parent, or -1
+    :param rotations: The euler angles of each bone's bind pose
+    :param positions: The position of each bone's bind pose
+    :param inverse_bind_matrices: The inverse world matrix of each bone's
+        bind pose
+    :param animation: The model's `Animation`
+    """
+    def __init__(
+        self, parents, rotations, positions, inverse_bind_matrices, animation
+    ):
+        self.parents = np.asarray(parents, dtype=np.intp)
+        self.inverse_bind_matrices = np.asarray(
+            inverse_bind_matrices, dtype=np.float32
+        )
+        self.animation = animation
+
+        self.bind_matrices = np.matmul(
+            matrix.translations(positions), matrix.rotations(rotations)
+        )
+
+        depth = depths(self.parents)
+        self.levels = [
+            np.flatnonzero(depth == level)
+            for level in range(depth.max(initial=-1) + 1)
+        ]
+
+        # The pose last evaluated, drawing the model and its skeleton share
+        # it
+        self.pose_time = None
+        self.pose = None
+
+    @classmethod
+    def from_arrays(cls, arrays, animation):
+        """Create the skeleton from the arrays of `model.bone_arrays`"""
+        return cls(
+            arrays['bone_parents'],
+            arrays['bone_rotations'],
+            arrays['bone_positions'],
+            arrays['inverse_bind_matrices'],
+            animation
+        )
+
+    def __len__(self):
+        return len(self.parents)
+
+    @reify
+    def key(self):
+        """A digest of the bones and their keyframes, identical skeletons
+        playing the same clip have the same key
+        """
+        digest = hashlib.sha1()
+        for array in [
+            self.parents, self.bind_matrices, self.inverse_bind_matrices
+        ] + list(self.animation.arrays().values()):
+            digest.update(np.ascontiguousarray(array).tobytes())
+
+        return digest.hexdigest()
+
+    def local_matrices(self, rotations, translations):
+        """Every bone's matrix relative to its parent, from its sampled
+        keyframes. The keyframes can have leading axes, for several poses.
+        """
+        shape = rotations.shape[:-1] + (4, 4)
+
+        return np.matmul(self.bind_matrices, np.matmul(
+            matrix.translations(translations), matrix.rotations(rotations)
+        ).reshape(shape))
+
+    def propagate(self, local):
+        """Every bone's world matrix, from its local matrix"""
+        world = np.empty_like(local)
+
+        roots = self.levels[0]
+        world[..., roots, :, :] = local[..., roots, :, :]
+        for level in self.levels[1:]:
+            world[..., level, :, :] = np.matmul(
+                world[..., self.parents[level], :, :], local[..., level, :, :]
+            )
+
+        return world
+
+    def world_matrices(self, t):
+        """Every bone's matrix at `t`"""
+        if not len(self):
+            return np.empty((0, 4, 4), dtype=np.float32)
+
+        if t == self.pose_time:
+            return self.pose
+
+        world = self.propagate(
+            self.local_matrices(*self.animation.sample(t))
+        )
+
+        self.pose_time, self.pose = t, world
+        return world
+
+    def skinning_matrices(self, t):
+        """The matrices taking vertices from the bind pose to the pose at
+        `t`
+        """
+        return np.matmul(self.world_matrices(t), self.inverse_bind_matrices)
+
+    def bake(self, rate, length, compact=False):
+        """Evaluate the skinning matrices `rate` times a second over the
+        first `length` seconds, see `BakedAnimation`
+        """
+        count = int(np.ceil(length * rate)) + 1
+        # Past the last keyframe the tracks hold their value, so the last
+        # frame is a whole step after the one before it like every other
+        times = np.arange(count) / rate
+
+        local = self.local_matrices(
+            self.animation.rotations.sample_at_times(times),
+            self.animation.translations.sample_at_times(times)
+        )
+        table = np.matmul(
+            self.propagate(local), self.inverse_bind_matrices
+        ).astype(np.float32)
+
+        if compact:
+            table = BakedAnimation.compact_table(table)
+
+        return BakedAnimation(table, rate, self.key)
+
+
+class PoseCache(object):
+    """Skinning matrices shared between models, by skeleton and time
+
+    Times are rounded to a multiple of `quantum` and the pose is evaluated at
+    the rounded time, so every model landing on the same key gets the same,
+    read-only, array. The least recently used poses are dropped to keep the
+    cache within `budget` bytes.
+
+    :param budget: The most bytes of matrices to keep
+    :param quantum: The time step poses are rounded to, or None to only share
+        poses at exactly the same time
+    :ivar hits: The number of poses found in the cache
+    :ivar misses: The number of poses evaluated
+    """
+    def __init__(self, budget=16 << 20, quantum=1 / 120):
+        self.budget = budget
+        self.quantum = quantum
+
+        self.poses = odict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.poses)
+
+    def quantize(self, t):
+        if not self.quantum:
+            return t, t
+
+        step = int(round(t / self.quantum))
+        return step, step * self.quantum
+
+    def skinning_matrices(self, skeleton, t):
+        step, t = self.quantize(t)
+        key = (skeleton.key, step)
+
+        pose = self.poses.get(key)
+        if pose is not None:
+            self.hits += 1
+            self.poses.move_to_end(key)
+            return pose
+
+        self.misses += 1
+        pose = skeleton.skinning_matrices(t)
+        pose.flags.writeable = False
+
+        self.poses[key] = pose
+        self.size += pose.nbytes
+        self.evict()
+
+        return pose
+
+    def evict(self):
+        while self.size > self.budget and self.poses:
+            _, pose = self.poses.popitem(last=False)
+            self.size -= pose.nbytes
+
+    def clear(self):
+        self.poses.clear()
+        self.size = 0
+
+
+class BakedAnimation(object):
+    """A skeleton's skinning matrices evaluated at a fixed rate. Sampling is
+    a lookup and a blend of the two frames around the time, whatever the
+    depth of the skeleton or the number of keyframes.
+
+    The table either holds whole matrices, or compact frames of a
+    translation and a quaternion (x, y, z, w) for each bone, less than half
+    the size.
+
+    :param table: The (frames, bones, 4, 4) matrices, or the
+        (frames, bones, 7) compact frames
+    :param rate: The frames per second
+    :param key: The `Skeleton.key` of the baked skeleton
+    """
+    def __init__(self, table, rate, key=None):
+        self.table = table
+        self.rate = rate
+        self.key = key
+
+    @staticmethod
+    def compact_table(table):
+        """Compact a table of matrices into translations and quaternions"""
+        quaternions = matrix.continuous_quaternions(
+            matrix.matrix_quaternions(table)
+        )
+
+        return np.concatenate(
+            [table[..., :3, 3], quaternions], axis=-1
+        ).astype(np.float32)
+
+    @property
+    def compact(self):
+        return self.table.shape[-1] == 7
+
+    def frames(self, t):
+        """The frames before and after `t`, and how far between them it is
+        """
+        position = max(t * self.rate, 0.0)
+        last = len(self.table) - 1
+
+        a = min(int(position), last)
+        return a, min(a + 1, last), position - a
+
+    def skinning_matrices(self, t):
+        a, b, factor = self.frames(t)
+        pose = lerp(self.table[a], self.table[b], factor)
+
+        if not self.compact:
+            return pose.astype(np.float32)
+
+        quaternions = pose[:, 3:]
+        quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+
+        matrices = matrix.quaternion_matrices(quaternions)
+        matrices[:, :3, 3] = pose[:, :3]
+
+        return matrices.astype(np.float32)
+
+    def save(self, path):
+        """Store the table, as a `cache` file"""
+        cache.write(
+            path, {'rate': self.rate, 'key': self.key}, {'table': self.table}
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load a table stored with `save`, mapped read-only"""
+        header, arrays = cache.read(path)
+        return cls(arrays['table'], header['rate'], header['key'])
@@ -1,5 +1,10 @@
+from collections.abc import Mapping
+import functools
+import io
 import struct
 
+import numpy as np
+
 from .. import destruct
 
 
@@ -34,14 +39,14 @@ class TriangleStruct(destruct.Struct):
     group_index = uint8_t
 
 
-class GroupStruct(destruct.Struct):
+class GroupStruct(destruct.Struct, record=True):
     flags = uint8_t
     name = destruct.String(32)
-    triangle_indices = destruct.Sequence(uint16_t, uint16_t)
+    triangle_indices = destruct.Array(uint16_t, uint16_t)
     material_index = int8_t
 
 
-class MaterialStruct(destruct.Struct):
+class MaterialStruct(destruct.Struct, record=True):
     name = destruct.String(32)
     ambient = destruct.Tuple(float_t, float_t, float_t, float_t)
     diffuse = destruct.Tuple(float_t, float_t, float_t, float_t)
@@ -73,13 +78,28 @@ class KeyframeStruct(destruct.Type):
         frame_counts = s.unpack(fp.read(s.size))
 
         return {
-            name: [
-                child.deserialize(fp) for _ in range(count)
-            ] for (name, child), count in zip(self.children, frame_counts)
+            name: child.deserialize_array(fp, count)
+            for (name, child), count in zip(self.children, frame_counts)
         }
 
+    def skip(self, fp):
+        s = struct.Struct('<HH')
+        frame_counts = s.unpack(fp.read(s.size))
+
+        fp.seek(sum(
+            child.size * count
+            for (name, child), count in zip(self.children, frame_counts)
+        ), 1)
+
+    def serialize(self, data, fp):
+        arrays = [child.to_array(data[name]) for name, child in self.children]
+
+        fp.write(struct.pack('<HH', *map(len, arrays)))
+        for array in arrays:
+            fp.write(array.tobytes())
 
-class JointStruct(destruct.Struct):
+
+class JointStruct(destruct.Struct, record=True):
     flags = uint8_t
     name = destruct.String(32)
     parent_name = destruct.String(32)
@@ -89,7 +109,7 @@ class JointStruct(destruct.Struct):
     keyframes = KeyframeStruct()
 
 
-class CommentStruct(destruct.Struct):
+class CommentStruct(destruct.Struct, record=True):
     index = uint32_t
     comment = destruct.DynamicString(int32_t)
 
@@ -104,16 +124,37 @@ class CommentsStruct(destruct.Struct):
 
 
 class FloatButReallyItsAnInteger(destruct.Type):
+    converts = True
+
     def __init__(self, storage_type, max_value):
         super().__init__()
         self.storage_type = storage_type
         self.max_value = max_value
 
+    @property
+    def layout(self):
+        return self.storage_type.layout
+
+    @property
+    def dtype(self):
+        return self.storage_type.dtype
+
+    def assemble(self, values):
+        return self.storage_type.assemble(values) / self.max_value
+
+    def from_array(self, array):
+        return self.storage_type.from_array(array) / self.max_value
+
+    def to_array(self, data):
+        return self.storage_type.to_array(
+            np.round(np.multiply(data, self.max_value))
+        )
+
     def deserialize(self, fp):
         return self.storage_type.deserialize(fp) / self.max_value
 
     def serialize(self, data, fp):
-        self.storage_type.serialize(int(data * self.max_value), fp)
+        self.storage_type.serialize(round(data * self.max_value), fp)
 
 
 class ExtendedVertexStructV1(destruct.Struct):
@@ -155,12 +196,76 @@ class ExtendedModelStructV1(destruct.Struct):
     alpha_ref = float_t
 
 
+def extended_joint_struct(subversion):
+    if subversion == 1:
+        return ExtendedJointStructV1()
+
+    raise ValueError('Invalid Subversion for extended joints')
+
+
+def extended_model_struct(subversion):
+    if subversion == 1:
+        return ExtendedModelStructV1()
+
+    raise ValueError('Invalid Subversion for extended model')
+
+
+def deserialize_extension(fp, extended_struct, count=None):
+    """Deserialize one of the optional sections following the comments, a
+    sub version followed by `count` records, or a single record when `count`
+    is None.
+
+    Returns None when the file ends before the section.
+    """
+    raw_data = fp.read(uint32_t.size)
+    if not raw_data:
+        return None
+
+    sub_version, = uint32_t.struct.unpack(raw_data)
+    extended = extended_struct(sub_version)
+
+    if count is None:
+        return extended.deserialize(fp)
+
+    return extended.deserialize_array(fp, count)
+
+
+def skip_extension(fp, extended_struct, count=None):
+    raw_data = fp.read(uint32_t.size)
+    if not raw_data:
+        return
+
+    sub_version, = uint32_t.struct.unpack(raw_data)
+    size = extended_struct(sub_version).size
+    fp.seek(size if count is None else size * count, 1)
+
+
+def extension_sub_version(data):
+    """The sub version to serialize extension records with. Only the
+    extended vertices have a second version, which adds the extra field.
+    """
+    if isinstance(data, Mapping):
+        fields = data
+    else:
+        fields = data[0] if len(data) else ()
+
+    return 2 if 'extra' in fields else 1
+
+
+def count(data):
+    """The number of records in a list of records or a mapping of columns"""
+    if isinstance(data, Mapping):
+        return len(next(iter(data.values())))
+
+    return len(data)
+
+
 class MS3DSpec(destruct.Struct):
     signature = destruct.Signature(b'MS3D000000')
     version = int32_t
 
-    vertices = destruct.Sequence(uint16_t, VertexStruct())
-    triangles = destruct.Sequence(uint16_t, TriangleStruct())
+    vertices = destruct.Array(uint16_t, VertexStruct())
+    triangles = destruct.Array(uint16_t, TriangleStruct())
     groups = destruct.Sequence(uint16_t, GroupStruct())
     materials = destruct.Sequence(uint16_t, MaterialStruct())
 
@@ -172,25 +277,91 @@ class MS3DSpec(destruct.Struct):
 
     comments = CommentsStruct()
 
-    def deserialize(self, fp):
-        data = super().deserialize(fp)
-
-        sub_version = uint32_t.deserialize(fp)
-
-        vertex_ex = extended_vertex_struct(sub_version)
-        data['vertices_ex'] = [
-            vertex_ex.deserialize(fp)
-            for vertex in data['vertices']
-        ]
-
-        # sub_version = uint32_t.deserialize(fp)
-        # extended_joint = ExtendedJointStructV1()
-        # data['joint_ex'] = [
-        #     extended_joint.deserialize(fp)
-        #     for joint in data['joints']
-        # ]
-        # sub_version = uint32_t.deserialize(fp)
-        # extended_model = ExtendedModelStructV1()
-        # data['model_ex'] = extended_model.deserialize(fp)
+    #: The optional sections following the comments, as the name of the
+    #: section, the name of the section it has a record for each element of
+    #: (or None for a single record) and a factory for the sub version struct
+    extensions = [
+        ('vertices_ex', 'vertices', extended_vertex_struct),
+        ('joints_ex', 'joints', extended_joint_struct),
+        ('model_ex', None, extended_model_struct),
+    ]
+
+    def deserialize(self, fp, report=None):
+        data = super().deserialize(fp, report)
+
+        for name, parent, extended_struct in self.extensions:
+            extension_count = None if parent is None else count(data[parent])
+            deserialize = functools.partial(
+                deserialize_extension,
+                extended_struct=extended_struct,
+                count=extension_count
+            )
+
+            if report is None:
+                data[name] = deserialize(fp)
+            else:
+                data[name] = report.measure(
+                    name, fp, deserialize,
+                    1 if extension_count is None else extension_count
+                )
 
         return data
+
+    def index(self, fp):
+        sections = super().index(fp)
+
+        for name, parent, extended_struct in self.extensions:
+            section_count = None if parent is None else sections[parent].count
+            sections[name] = destruct.Section(fp.tell(), section_count)
+
+            skip_extension(fp, extended_struct, section_count)
+
+        return sections
+
+    def deserialize_lazy(self, fp):
+        data = super().deserialize_lazy(fp)
+
+        for name, _, extended_struct in self.extensions:
+            data.loaders[name] = functools.partial(
+                deserialize_extension,
+                extended_struct=extended_struct,
+                count=data.sections[name].count
+            )
+
+        return data
+
+    def stream(self, fp, name, chunk_size=1024):
+        """Stream the records of the section `name`, decoding at most
+        `chunk_size` of them at a time. The vertex and joint extensions can
+        be streamed as well.
+        """
+        for extension, parent, extended_struct in self.extensions:
+            if extension == name and parent is not None:
+                section = self.index(fp)[name]
+                fp.seek(section.offset)
+
+                sub_version = uint32_t.deserialize(fp)
+                return destruct.SequenceStream(
+                    fp, extended_struct(sub_version), section.count,
+                    chunk_size
+                )
+
+        return super().stream(fp, name, chunk_size)
+
+    def serialize(self, data, fp):
+        # Serialize into memory first, so the whole file is a single write
+        buffer = io.BytesIO()
+        super().serialize(data, buffer)
+
+        for name, _, extended_struct in self.extensions:
+            if data.get(name) is None:
+                break
+
+            sub_version = extension_sub_version(data[name])
+            uint32_t.serialize(sub_version, buffer)
+
+            # A single record is written as an array of one
+            extended = extended_struct(sub_version)
+            buffer.write(extended.to_array(data[name]).tobytes())
+
+        fp.write(buffer.getbuffer())
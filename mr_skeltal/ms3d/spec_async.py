@@ -0,0 +1,64 @@
+"""Deserialize models from an `asyncio.StreamReader`, see `destruct_async`
+
+Importing this module registers the coroutines of the MS3D types that
+decode themselves, the keyframes and the optional extension sections.
+
+This module needs Python 3.6, import it only where coroutines are used.
+"""
+import asyncio
+import struct
+
+from .. import destruct, destruct_async
+from . import spec
+
+
+async def deserialize(reader):
+    """Deserialize a model, as `MS3DSpec().deserialize` would"""
+    return await destruct_async.deserialize(spec.MS3DSpec(), reader)
+
+
+@destruct_async.walk.register(spec.KeyframeStruct)
+async def walk_keyframes(type_, reader):
+    s = struct.Struct('<HH')
+    frame_counts = s.unpack(await reader.readexactly(s.size))
+
+    data = {}
+    for (name, child), count in zip(type_.children, frame_counts):
+        raw_data = await reader.readexactly(child.size * count)
+        data[name] = child.deserialize_array(
+            destruct.Buffer(raw_data), count
+        )
+
+    return data
+
+
+async def deserialize_extension(reader, extended_struct, count=None):
+    """Like `spec.deserialize_extension`, reading from `reader`"""
+    try:
+        raw_data = await reader.readexactly(spec.uint32_t.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise
+        return None
+
+    sub_version, = spec.uint32_t.struct.unpack(raw_data)
+    extended = extended_struct(sub_version)
+
+    if count is None:
+        return await destruct_async.deserialize(extended, reader)
+
+    raw_data = await reader.readexactly(extended.size * count)
+    return extended.deserialize_array(destruct.Buffer(raw_data), count)
+
+
+@destruct_async.walk.register(spec.MS3DSpec)
+async def walk_spec(type_, reader):
+    data = await destruct_async.walk_struct(type_, reader)
+
+    for name, parent, extended_struct in type_.extensions:
+        data[name] = await deserialize_extension(
+            reader, extended_struct,
+            None if parent is None else spec.count(data[parent])
+        )
+
+    return data
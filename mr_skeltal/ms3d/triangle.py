@@ -1,7 +1,29 @@
+from .views import Views
+from .vertex import Vertex
+
+
 class Triangle(object):
-    __slots__ = ['vertices', 'normals', 'texcoords']
+    """A triangle of a model, viewing a row of the model's triangle arrays
+
+    :param model: The `MS3DModel` the triangle belongs to
+    :param index: The index of the triangle in the model
+    """
+    __slots__ = ['model', 'index']
+
+    def __init__(self, model, index):
+        self.model = model
+        self.index = index
+
+    @property
+    def vertices(self):
+        return Views(
+            Vertex, self.model, self.model.triangle_indices[self.index]
+        )
+
+    @property
+    def normals(self):
+        return self.model.normals[self.index]
 
-    def __init__(self, vertices, normals, texcoords):
-        self.vertices = vertices
-        self.normals = normals
-        self.texcoords = texcoords
+    @property
+    def texcoords(self):
+        return self.model.texcoords[self.index]
@@ -1,7 +1,23 @@
 class Vertex(object):
-    __slots__ = ['coords', 'bone_weights', 'bone_ids']
+    """A vertex of a model, viewing a row of the model's vertex arrays
 
-    def __init__(self, coords, bone_weights, bone_ids):
-        self.coords = coords
-        self.bone_weights = bone_weights
-        self.bone_ids = bone_ids
+    :param model: The `MS3DModel` the vertex belongs to
+    :param index: The index of the vertex in the model
+    """
+    __slots__ = ['model', 'index']
+
+    def __init__(self, model, index):
+        self.model = model
+        self.index = index
+
+    @property
+    def coords(self):
+        return self.model.positions[self.index]
+
+    @property
+    def bone_weights(self):
+        return self.model.bone_weights[self.index]
+
+    @property
+    def bone_ids(self):
+        return self.model.bone_ids[self.index]
@@ -0,0 +1,24 @@
+from collections.abc import Sequence
+
+
+class Views(Sequence):
+    """A sequence of views into the arrays of a model, which are only created
+    when they are accessed.
+
+    :param view_type: The view class, called with the model and an index
+    :param model: The model the views are into
+    :param indices: The index of each view in the model's arrays
+    """
+    def __init__(self, view_type, model, indices):
+        self.view_type = view_type
+        self.model = model
+        self.indices = indices
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Views(self.view_type, self.model, self.indices[index])
+
+        return self.view_type(self.model, self.indices[index])
+
+    def __len__(self):
+        return len(self.indices)
@@ -16,7 +16,7 @@ setup(
         'mr_skeltal'
     ],
     install_requires=[
-        'numpy',
+        'numpy>=1.17',
         'PyOpenGL',
         'Pillow',
         'pygame'
@@ -32,7 +32,8 @@ setup(
     },
     entry_points={
         'console_scripts': [
-            'mr_skeltal = mr_skeltal.__main__:main'
+            'mr_skeltal = mr_skeltal.__main__:main',
+            'mr_skeltal_batch = mr_skeltal.batch:main'
         ]
     }
 )
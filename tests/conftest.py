@@ -0,0 +1,30 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# Coroutines and class keyword arguments are syntax errors before Python 3.6,
+# so these can't even be collected to be skipped
+collect_ignore = []
+if sys.version_info < (3, 6):
+    collect_ignore += ['test_destruct_36.py', 'test_destruct_async.py']
+
+MODEL_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'models', 'cube_test.ms3d'
+)
+
+
+@pytest.fixture(scope='session')
+def cube_path():
+    """The test model, shared by all the tests so it must not be changed"""
+    return MODEL_PATH
+
+
+@pytest.fixture
+def model_path(tmpdir):
+    """A copy of the test model that a test is free to change"""
+    path = str(tmpdir.join('model.ms3d'))
+    shutil.copy(MODEL_PATH, path)
+
+    return path
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from mr_skeltal.ms3d import MS3DModel
+from mr_skeltal.ms3d.animation import Tracks
+from mr_skeltal.ms3d.keyframes import Keyframes
+
+
+@pytest.fixture
+def tracks():
+    random = np.random.RandomState(0)
+
+    return [
+        (
+            np.cumsum(random.uniform(0.01, 0.2, count)).astype(np.float32),
+            random.normal(size=(count, 3)).astype(np.float32)
+        ) for count in (1, 5, 40, 300)
+    ]
+
+
+def test_sample(tracks):
+    packed = Tracks.pack(tracks)
+    keyframes = [Keyframes(*track) for track in tracks]
+    assert len(packed) == 4
+
+    samples = np.concatenate([
+        np.linspace(-1, packed.max_time + 1, 500),
+        np.random.RandomState(1).uniform(-1, packed.max_time + 1, 100),
+    ])
+
+    for t in samples:
+        np.testing.assert_allclose(
+            packed.sample(t),
+            [track.frame_at_time(t) for track in keyframes],
+            rtol=1e-5, atol=1e-6
+        )
+
+    np.testing.assert_allclose(
+        packed.sample_at_times(samples),
+        np.stack([track.frame_at_times(samples) for track in keyframes], 1),
+        rtol=1e-5, atol=1e-6
+    )
+
+
+def test_model_animation(cube_path):
+    model = MS3DModel(cube_path)
+    animation = model.animation
+    assert len(animation) == len(model.bones)
+
+    for index, bone in enumerate(model.bones.values()):
+        # The bones' keyframes are views of the packed arrays
+        assert np.shares_memory(
+            bone.rotation_keyframes.values, animation.rotations.values
+        )
+
+        t = model.animation_length * index / len(animation)
+        rotations, translations = animation.sample(t)
+        np.testing.assert_allclose(
+            rotations[index], bone.rotation_keyframes.frame_at_time(t),
+            rtol=1e-5, atol=1e-6
+        )
+        np.testing.assert_allclose(
+            translations[index], bone.translation_keyframes.frame_at_time(t),
+            rtol=1e-5, atol=1e-6
+        )
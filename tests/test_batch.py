@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from mr_skeltal import batch
+
+shared_memory = pytest.importorskip('multiprocessing.shared_memory')
+
+
+def test_share_receive():
+    array = np.arange(12, dtype=np.float32).reshape(4, 3)
+
+    shared = batch.share(array)
+    received = batch.receive(shared)
+
+    np.testing.assert_equal(received, array)
+    assert received.dtype == array.dtype
+
+
+def test_share_arrays_frees_blocks_on_error(monkeypatch):
+    shared = []
+
+    def share(array):
+        shared.append(batch_share(array))
+        return shared[-1]
+
+    batch_share = batch.share
+    monkeypatch.setattr(batch, 'share', share)
+
+    model = SimpleNamespace(positions=np.zeros((4, 3), dtype=np.float32))
+
+    with pytest.raises(AttributeError):
+        batch.share_arrays(model, ['positions', 'normals'])
+
+    assert len(shared) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=shared[0].name)
+
+
+@pytest.mark.skipif(
+    not os.path.isdir('/dev/shm'), reason='needs POSIX shared memory'
+)
+def test_run_stopped_early(cube_path):
+    blocks = set(os.listdir('/dev/shm'))
+
+    results = batch.run([cube_path] * 4, jobs=2, arrays=['positions'])
+    next(results)
+    results.close()
+
+    assert set(os.listdir('/dev/shm')) <= blocks
+
+
+def test_run(cube_path, tmpdir):
+    bad_path = str(tmpdir.join('bad.ms3d'))
+    with open(bad_path, 'wb') as fp:
+        fp.write(b'not a model')
+
+    results = {
+        os.path.basename(result['path']): result
+        for result in batch.run(
+            [cube_path, bad_path], jobs=2, arrays=['positions']
+        )
+    }
+
+    assert 'DestructError' in results['bad.ms3d']['error']
+
+    result = results['cube_test.ms3d']
+    assert result['triangles'] == 240
+    assert result['bbox'] == [[-1, 0, -1], [1, 7, 1]]
+    assert result['arrays']['positions'].shape == (122, 3)
+
+
+def test_main(cube_path, tmpdir):
+    output = str(tmpdir.mkdir('output'))
+
+    assert batch.main([
+        cube_path, '--output', output, '--arrays', 'normals', '-j', '1'
+    ]) == 0
+
+    with open(os.path.join(output, 'cube_test.ms3d.json')) as fp:
+        assert json.load(fp)['bones'] == 7
+
+    arrays = np.load(os.path.join(output, 'cube_test.ms3d.npz'))
+    assert arrays['normals'].shape == (240, 3, 3)
+
+
+def test_main_same_file_names(cube_path, tmpdir):
+    paths = []
+    for directory in ('a', 'b'):
+        path = tmpdir.mkdir(directory).join('hero.ms3d')
+        shutil.copy(cube_path, str(path))
+        paths.append(str(path))
+
+    output = str(tmpdir.mkdir('output'))
+    assert batch.main(paths + ['--output', output]) == 0
+
+    for directory in ('a', 'b'):
+        result = os.path.join(output, directory, 'hero.ms3d.json')
+        assert os.path.exists(result)
+
+
+def test_output_names():
+    names = batch.output_names([
+        os.path.join('models', 'a', 'hero.ms3d'),
+        os.path.join('models', 'b', 'hero.ms3d'),
+        os.path.join('models', 'b', 'hero.ms3d'),
+    ])
+
+    assert sorted(set(names.values())) == [
+        os.path.join('a', 'hero.ms3d'), os.path.join('b', 'hero.ms3d')
+    ]
@@ -1,5 +1,9 @@
+import struct
 from io import BytesIO
 
+import numpy as np
+import pytest
+
 from mr_skeltal import destruct
 
 
@@ -94,3 +98,309 @@ def test_serialize():
     assert BINARY_FILE == fp.getvalue(), (
         'serialized struct doesn\'t match reference binary!'
     )
+
+
+class CountingBytesIO(BytesIO):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+
+    def read(self, *args):
+        self.reads += 1
+        return super().read(*args)
+
+
+class Vec3(destruct.NamedTuple):
+    __types__ = [
+        ('x', destruct.Number('f', '<')),
+        ('y', destruct.Number('f', '<')),
+        ('z', destruct.Number('f', '<')),
+    ]
+
+
+class FixedStruct(destruct.Struct):
+    __types__ = [
+        ('flags', destruct.Number('B', '<')),
+        ('position', Vec3()),
+        ('normals', destruct.Tuple(Vec3(), Vec3())),
+        ('index', destruct.Number('H', '<')),
+    ]
+
+
+FIXED_BINARY = (b'\x07'
+                b'\x00\x00\x80?\x00\x00\x00@\x00\x00@@'
+                b'\x00\x00\x80@\x00\x00\xa0@\x00\x00\xc0@'
+                b'\x00\x00\x80?\x00\x00\x00@\x00\x00@@'
+                b'\x2a\x00')
+
+FIXED_DATA = dict(
+    flags=7,
+    position=(1.0, 2.0, 3.0),
+    normals=((4.0, 5.0, 6.0), (1.0, 2.0, 3.0)),
+    index=42
+)
+
+
+def test_fixed_struct_is_fused():
+    fixed = FixedStruct()
+
+    assert fixed.layout == ('<', 'BfffffffffH')
+    assert fixed.struct.size == len(FIXED_BINARY)
+    assert SomeStruct().layout is None
+
+
+def test_fixed_struct_deserialize():
+    fp = CountingBytesIO(FIXED_BINARY)
+    data = FixedStruct().deserialize(fp)
+
+    assert data == FIXED_DATA
+    assert data['position'].y == 2.0
+    assert fp.reads == 1, 'fixed size structs should be read at once'
+
+
+def test_fixed_sequence_deserialize():
+    sequence = destruct.Sequence(destruct.Number('H', '<'), FixedStruct())
+    fp = CountingBytesIO(b'\x02\x00' + FIXED_BINARY * 2)
+
+    assert sequence.deserialize(fp) == [FIXED_DATA, FIXED_DATA]
+    assert fp.reads == 2, 'fixed size sequences should be read at once'
+
+
+def test_mixed_byte_order_is_not_fused():
+    mixed = destruct.Tuple(
+        destruct.Number('H', '<'),
+        destruct.Number('H', '>')
+    )
+
+    assert mixed.layout is None
+    assert mixed.deserialize(BytesIO(b'\x01\x00\x00\x01')) == (1, 1)
+
+
+class Weight(destruct.Type):
+    converts = True
+
+    @property
+    def dtype(self):
+        return np.dtype('u1')
+
+    def from_array(self, array):
+        return array / 255
+
+    def to_array(self, data):
+        return np.round(np.multiply(data, 255)).astype(self.dtype)
+
+
+class WeightedStruct(destruct.Struct):
+    __types__ = [
+        ('flags', destruct.Number('B', '<')),
+        ('weights', destruct.Tuple(Weight(), Weight())),
+    ]
+
+
+def test_fixed_struct_dtype():
+    dtype = FixedStruct().dtype
+
+    assert dtype.names == ('flags', 'position', 'normals', 'index')
+    assert dtype.itemsize == len(FIXED_BINARY)
+    assert dtype['normals'].shape == (2, 3)
+    assert SomeStruct().dtype is None
+
+
+class FixedSequenceStruct(destruct.Struct):
+    __types__ = [
+        ('elements', destruct.Sequence(
+            destruct.Number('H', '<'), FixedStruct()
+        )),
+    ]
+
+
+def test_fixed_sequence_truncated():
+    fp = BytesIO(b'\x03\x00' + FIXED_BINARY * 2)
+
+    with pytest.raises(destruct.DestructError) as excinfo:
+        FixedSequenceStruct().deserialize(fp)
+
+    assert str(excinfo.value) == (
+        'Error when trying to deserialize elements'
+    )
+
+
+def test_array_deserialize():
+    array = destruct.Array(destruct.Number('H', '<'), FixedStruct())
+    fp = CountingBytesIO(b'\x03\x00' + FIXED_BINARY * 3)
+
+    columns = array.deserialize(fp)
+
+    assert fp.reads == 2, 'arrays should be read at once'
+    assert sorted(columns) == ['flags', 'index', 'normals', 'position']
+    np.testing.assert_equal(columns['flags'], [7, 7, 7])
+    np.testing.assert_equal(columns['index'], [42, 42, 42])
+    np.testing.assert_equal(columns['position'], [[1.0, 2.0, 3.0]] * 3)
+    np.testing.assert_equal(
+        columns['normals'],
+        [FIXED_DATA['normals']] * 3
+    )
+
+
+def test_array_converts_columns():
+    array = destruct.Array(destruct.Number('H', '<'), WeightedStruct())
+    columns = array.deserialize(BytesIO(b'\x02\x00\x01\xff\x00\x02\x00\xff'))
+
+    np.testing.assert_equal(columns['flags'], [1, 2])
+    np.testing.assert_almost_equal(columns['weights'], [[1, 0], [0, 1]])
+
+
+def test_array_serialize():
+    array = destruct.Array(destruct.Number('H', '<'), WeightedStruct())
+    binary = b'\x02\x00\x01\xff\x00\x02\x00\xff'
+
+    fp = BytesIO()
+    array.serialize(array.deserialize(BytesIO(binary)), fp)
+    assert fp.getvalue() == binary
+
+    fp = BytesIO()
+    array.serialize([
+        {'flags': 1, 'weights': (1.0, 0.0)},
+        {'flags': 2, 'weights': (0.0, 1.0)},
+    ], fp)
+    assert fp.getvalue() == binary
+
+
+def test_buffer_deserialize():
+    fp = destruct.Buffer(BINARY_FILE)
+
+    assert TEST_DATA == spec.deserialize(fp), (
+        'deserialized struct doesn\'t match reference!'
+    )
+    assert fp.tell() == len(BINARY_FILE)
+
+
+def test_buffer_seek():
+    fp = destruct.Buffer(BINARY_FILE, offset=20)
+
+    assert bytes(fp.read(2)) == b'\x84\xff'
+    assert fp.seek(-2, 1) == 20
+    assert fp.seek(-4, 2) == len(BINARY_FILE) - 4
+    assert len(fp.read(10)) == 4
+
+
+def test_buffer_array_is_a_view():
+    raw_data = bytearray(b'\x02\x00' + FIXED_BINARY * 2)
+    array = destruct.Array(destruct.Number('H', '<'), FixedStruct())
+
+    columns = array.deserialize(destruct.Buffer(raw_data))
+    raw_data[-2:] = b'\x07\x00'
+
+    np.testing.assert_equal(columns['index'], [42, 7])
+
+
+def test_sequence_stream():
+    sequence = destruct.Sequence(destruct.Number('H', '<'), FixedStruct())
+    fp = CountingBytesIO(b'\x05\x00' + FIXED_BINARY * 5 + b'tail')
+
+    stream = sequence.stream(fp, chunk_size=2)
+    assert fp.reads == 1, 'nothing should be decoded before iterating'
+
+    assert len(stream) == 5
+    assert next(stream) == FIXED_DATA
+    assert next(stream) == FIXED_DATA
+    assert fp.reads == 2, 'elements should be read in chunks'
+
+    stream.skip()
+    assert list(stream) == []
+    assert fp.read() == b'tail'
+
+
+def test_deserialize_many_truncated():
+    pair = destruct.Tuple(destruct.Number('H', '<'), destruct.Number('H', '<'))
+
+    with pytest.raises(struct.error):
+        pair.deserialize_many(BytesIO(b'\x01\x00\x02\x00'), 2)
+
+
+def test_sequence_stream_truncated():
+    sequence = destruct.Sequence(destruct.Number('H', '<'), FixedStruct())
+    fp = BytesIO(b'\x03\x00' + FIXED_BINARY * 2)
+
+    with pytest.raises(struct.error):
+        list(sequence.stream(fp))
+
+
+def test_struct_stream():
+    stream = spec.stream(BytesIO(BINARY_FILE), 'sequence', chunk_size=1)
+
+    assert list(stream) == TEST_DATA['sequence']
+
+
+def test_deserialize_report():
+    report = destruct.Report()
+
+    assert spec.deserialize(BytesIO(BINARY_FILE), report) == TEST_DATA
+    assert list(report)[:3] == ['string', 'byte', 'unsigned_byte']
+    assert report['byte'] == (1, 1, report['byte'].time)
+    assert report['sequence'].count == 2
+    assert report['sequence[]'].count == 2
+    assert report['sequence[].named_tuple'].size == 2 * 12
+    assert sum(
+        report[name].size for name, _ in spec.children
+    ) == len(BINARY_FILE)
+
+    with pytest.raises(destruct.DestructError) as excinfo:
+        spec.deserialize(BytesIO(BINARY_FILE[:-4]), destruct.Report())
+
+    assert str(excinfo.value) == 'Error when trying to deserialize sequence'
+
+
+def test_index():
+    sections = spec.index(BytesIO(BINARY_FILE))
+
+    assert list(sections) == [name for name, _ in spec.children]
+    assert sections['string'] == (0, None)
+    assert sections['byte'] == (20, None)
+    assert sections['sequence'] == (34, 2)
+
+
+def test_deserialize_lazy():
+    fp = CountingBytesIO(BINARY_FILE)
+    data = spec.deserialize_lazy(fp)
+    reads = fp.reads
+
+    assert data['integer'] == TEST_DATA['integer']
+    assert fp.reads == reads + 1, 'only the requested field should be read'
+    assert dict(data) == TEST_DATA
+
+
+def test_decoder_is_cached():
+    assert spec.decoder is spec.decoder
+    assert 'def deserialize(fp):' in spec.decoder.source
+
+
+def test_deserialize_error_path():
+    fp = BytesIO(BINARY_FILE[:-4])
+
+    with pytest.raises(destruct.DestructError) as excinfo:
+        spec.deserialize(fp)
+
+    error = excinfo.value
+    assert str(error) == 'Error when trying to deserialize sequence'
+    assert str(error.__cause__) == (
+        'Error when trying to deserialize named_tuple'
+    )
+
+
+class Opaque(destruct.Type):
+    def deserialize(self, fp):
+        return bytes(fp.read(2))
+
+
+class OpaqueStruct(destruct.Struct):
+    __types__ = [
+        ('opaque', Opaque()),
+        ('number', destruct.Number('H', '<')),
+    ]
+
+
+def test_custom_deserialize_is_called():
+    data = OpaqueStruct().deserialize(BytesIO(b'ab\x01\x00'))
+
+    assert data == dict(opaque=b'ab', number=1)
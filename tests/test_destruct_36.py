@@ -1,4 +1,5 @@
 from io import BytesIO
+import pickle
 import sys
 
 import pytest
@@ -95,3 +96,58 @@ def test_serialize():
     assert BINARY_FILE == fp.getvalue(), (
         'serialized struct doesn\'t match reference binary!'
     )
+
+
+class RecordStruct(destruct.Struct, record=True):
+    name = destruct.DynamicString(destruct.Number('h', '<'))
+    position = NamedTuple()
+
+
+def test_record_deserialize():
+    record_spec = destruct.Sequence(destruct.Number('H', '<'), RecordStruct())
+    records = record_spec.deserialize(BytesIO(
+        b'\x01\x00' b'\x08\x00String 1' b'\x00\x00\x80?\x00\x00\x00@\x00\x00@@'
+    ))
+
+    record, = records
+    assert isinstance(record, RecordStruct.record)
+    assert not hasattr(record, '__dict__')
+    assert record.name == record['name'] == 'String 1'
+    assert record.position.z == 3.0
+    assert record == dict(name='String 1', position=(1.0, 2.0, 3.0))
+
+
+class IndexRecordStruct(destruct.Struct, record=True):
+    name = destruct.DynamicString(destruct.Number('h', '<'))
+    index = destruct.Number('H', '<')
+
+
+def test_record_pickle():
+    record = IndexRecordStruct().deserialize(
+        BytesIO(b'\x08\x00String 1\x2a\x00')
+    )
+
+    assert IndexRecordStruct.record.__module__ == __name__
+    assert IndexRecordStruct.record.__qualname__ == 'IndexRecordStruct.record'
+
+    loaded = pickle.loads(pickle.dumps(record))
+    assert type(loaded) is IndexRecordStruct.record
+    assert loaded == dict(name='String 1', index=42)
+
+
+class FixedStruct(destruct.Struct):
+    flags = destruct.Number('B', '<')
+    position = NamedTuple()
+    index = destruct.Number('H', '<')
+
+
+def test_fixed_record_deserialize():
+    class FixedRecord(FixedStruct, record=True):
+        pass
+
+    record = FixedRecord().deserialize(BytesIO(
+        b'\x07' b'\x00\x00\x80?\x00\x00\x00@\x00\x00@@' b'\x2a\x00'
+    ))
+
+    assert record.index == 42
+    assert dict(record) == dict(flags=7, position=(1.0, 2.0, 3.0), index=42)
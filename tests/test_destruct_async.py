@@ -0,0 +1,105 @@
+import asyncio
+from collections.abc import Mapping
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from mr_skeltal import destruct, destruct_async
+from mr_skeltal.ms3d import spec_async
+from mr_skeltal.ms3d.spec import MS3DSpec
+
+
+def run(coroutine):
+    """Run a coroutine on a new event loop, like `asyncio.run`"""
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def as_dicts(value):
+    if isinstance(value, Mapping):
+        return {key: as_dicts(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [as_dicts(item) for item in value]
+
+    return value
+
+
+class Vec3(destruct.NamedTuple):
+    x = destruct.Number('f', '<')
+    y = destruct.Number('f', '<')
+    z = destruct.Number('f', '<')
+
+
+class Child(destruct.Struct):
+    name = destruct.DynamicString(destruct.Number('h', '<'))
+    position = Vec3()
+    pair = destruct.Tuple(
+        destruct.DynamicString(destruct.Number('h', '<')),
+        destruct.Number('B', '<')
+    )
+
+
+class Parent(destruct.Struct):
+    children = destruct.Sequence(destruct.Number('H', '<'), Child())
+    positions = destruct.Sequence(destruct.Number('H', '<'), Vec3())
+
+
+BINARY = (b'\x02\x00'
+          b'\x01\x00a' b'\x00\x00\x80?\x00\x00\x00@\x00\x00@@'
+          b'\x01\x00b\x07'
+          b'\x01\x00c' b'\x00\x00\x80@\x00\x00\xa0@\x00\x00\xc0@'
+          b'\x00\x00\x08'
+          b'\x01\x00' b'\x00\x00\x80?\x00\x00\x00@\x00\x00@@')
+
+
+async def load(type_, binary):
+    reader = asyncio.StreamReader()
+    reader.feed_data(binary)
+    reader.feed_eof()
+
+    return await destruct_async.deserialize(type_, reader)
+
+
+def test_deserialize():
+    data = run(load(Parent(), BINARY))
+
+    assert data == Parent().deserialize(BytesIO(BINARY))
+    assert data['children'][1]['position'].y == 5.0
+    assert data['children'][1]['pair'] == ('', 8)
+
+
+def test_deserialize_truncated():
+    with pytest.raises(destruct.DestructError) as excinfo:
+        run(load(Parent(), BINARY[:-1]))
+
+    assert str(excinfo.value) == 'Error when trying to deserialize positions'
+
+
+def test_deserialize_model(cube_path):
+    with open(cube_path, 'rb') as fp:
+        raw = fp.read()
+
+    async def load_model(chunk_size):
+        reader = asyncio.StreamReader()
+
+        async def feed():
+            for offset in range(0, len(raw), chunk_size):
+                reader.feed_data(raw[offset:offset + chunk_size])
+                await asyncio.sleep(0)
+            reader.feed_eof()
+
+        data, _ = await asyncio.gather(spec_async.deserialize(reader), feed())
+        return data
+
+    data = MS3DSpec().deserialize(BytesIO(raw))
+
+    for chunk_size in (7, 4096):
+        np.testing.assert_equal(
+            as_dicts(run(load_model(chunk_size))), as_dicts(data)
+        )
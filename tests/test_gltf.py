@@ -0,0 +1,134 @@
+import io
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from mr_skeltal import matrix
+from mr_skeltal.ms3d import MS3DModel, gltf
+
+
+def read_glb(data):
+    magic, version, length = struct.unpack_from('<4sII', data)
+    assert (magic, version, length) == (b'glTF', 2, len(data))
+
+    json_length, json_type = struct.unpack_from('<II', data, 12)
+    assert json_type == gltf.JSON_CHUNK
+    document = json.loads(data[20:20 + json_length].decode('utf8'))
+
+    offset = 20 + json_length
+    bin_length, bin_type = struct.unpack_from('<II', data, offset)
+    assert bin_type == gltf.BIN_CHUNK
+    binary = data[offset + 8:offset + 8 + bin_length]
+
+    return document, binary
+
+
+def read_accessor(document, binary, index):
+    types = {value: key for key, value in gltf.COMPONENT_TYPES.items()}
+    shapes = {value: key for key, value in gltf.ACCESSOR_TYPES.items()}
+
+    accessor = document['accessors'][index]
+    view = document['bufferViews'][accessor['bufferView']]
+    assert view['byteOffset'] % 4 == 0
+
+    return np.frombuffer(
+        binary, types[accessor['componentType']],
+        accessor['count'] * int(np.prod(shapes[accessor['type']], dtype=int)),
+        view['byteOffset']
+    ).reshape((accessor['count'],) + shapes[accessor['type']])
+
+
+@pytest.fixture(scope='module')
+def model(cube_path):
+    return MS3DModel(cube_path)
+
+
+@pytest.fixture(scope='module')
+def glb(model):
+    fp = io.BytesIO()
+    gltf.export(model, fp)
+
+    return read_glb(fp.getvalue())
+
+
+def test_mesh(model, glb):
+    document, binary = glb
+    primitive, = document['meshes'][0]['primitives']
+    group, = model.groups
+
+    positions = read_accessor(
+        document, binary, primitive['attributes']['POSITION']
+    )
+    indices = read_accessor(document, binary, primitive['indices'])
+
+    np.testing.assert_array_equal(
+        positions[indices], group.vertex_buffer[group.index_buffer]
+    )
+
+    weights = read_accessor(
+        document, binary, primitive['attributes']['WEIGHTS_0']
+    )
+    np.testing.assert_allclose(weights.sum(axis=1), 1, rtol=1e-6)
+
+
+def node_matrices(document, binary, time):
+    """The global matrix of every node at `time`"""
+    nodes = document['nodes']
+    local = {}
+
+    for index, node in enumerate(nodes):
+        local[index] = {
+            'translation': node.get('translation', [0, 0, 0]),
+            'rotation': node.get('rotation', [0, 0, 0, 1]),
+        }
+
+    animation, = document['animations']
+    for channel in animation['channels']:
+        sampler = animation['samplers'][channel['sampler']]
+        times = read_accessor(document, binary, sampler['input'])
+        values = read_accessor(document, binary, sampler['output'])
+
+        target = channel['target']
+        local[target['node']][target['path']] = values[
+            np.searchsorted(times, time)
+        ]
+
+    parents = {
+        child: index for index, node in enumerate(nodes)
+        for child in node.get('children', [])
+    }
+
+    def global_matrix(index):
+        transform = np.dot(
+            matrix.translate(local[index]['translation']),
+            matrix.quaternion_matrices(local[index]['rotation'])
+        )
+        if index in parents:
+            transform = np.dot(global_matrix(parents[index]), transform)
+        return transform
+
+    return [global_matrix(index) for index in range(len(nodes))]
+
+
+def test_animation(model, glb):
+    document, binary = glb
+    skin, = document['skins']
+    inverse_bind_matrices = read_accessor(
+        document, binary, skin['inverseBindMatrices']
+    )
+
+    # Pick a keyframe, where the interpolation matches exactly
+    bone = next(iter(model.bones.values()))
+    model.timestamp = bone.rotation_keyframes.frames[40].time
+
+    global_matrices = node_matrices(document, binary, model.timestamp)
+    joint_matrices = [
+        np.dot(global_matrices[joint], inverse.T)
+        for joint, inverse in zip(skin['joints'], inverse_bind_matrices)
+    ]
+
+    np.testing.assert_allclose(
+        joint_matrices, model.bone_matrices, atol=1e-5
+    )
@@ -0,0 +1,134 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from mr_skeltal import mesh
+from mr_skeltal.ms3d import Group
+
+
+def make_model(**overrides):
+    """A model of two triangles over four vertices, each bone weighting one
+    vertex
+    """
+    arrays = dict(
+        positions=np.arange(12, dtype=np.float32).reshape(4, 3),
+        bone_weights=np.eye(4, dtype=np.float32),
+        bone_ids=np.arange(16, dtype=np.int16).reshape(4, 4),
+        triangle_indices=np.array([[0, 1, 2], [2, 3, 0]]),
+        normals=np.zeros((2, 3, 3), dtype=np.float32),
+        texcoords=np.zeros((2, 3, 2), dtype=np.float32)
+    )
+    arrays.update(overrides)
+
+    return SimpleNamespace(**arrays)
+
+
+def test_group_buffers():
+    model = make_model()
+    group = Group('group', [0, 1], None, model)
+
+    np.testing.assert_equal(group.vertex_indices, [0, 1, 2, 3])
+    np.testing.assert_equal(group.index_buffer, [0, 1, 2, 2, 3, 0])
+    assert group.index_buffer.dtype == np.uint16
+    np.testing.assert_equal(
+        group.vertex_buffer[group.index_buffer[3:]],
+        [[6, 7, 8], [9, 10, 11], [0, 1, 2]]
+    )
+    np.testing.assert_equal(group.bone_weight_buffer, model.bone_weights)
+    np.testing.assert_equal(group.bone_id_buffer[:, 0], [0, 4, 8, 12])
+    assert group.vertex_buffer.dtype == np.float32
+    assert group.normal_buffer.shape == (4, 3)
+
+
+def test_group_keeps_corners_with_different_texcoords():
+    model = make_model(
+        texcoords=np.arange(12, dtype=np.float32).reshape(2, 3, 2)
+    )
+    group = Group('group', [0, 1], None, model)
+
+    np.testing.assert_equal(group.vertex_indices, [0, 1, 2, 2, 3, 0])
+    np.testing.assert_equal(group.index_buffer, np.arange(6))
+    np.testing.assert_equal(
+        group.texcoord_buffer, model.texcoords.reshape(-1, 2)
+    )
+
+
+def test_group_triangle_views():
+    model = make_model(
+        normals=np.arange(18, dtype=np.float32).reshape(2, 3, 3)
+    )
+    group = Group('group', [1], None, model)
+
+    triangle, = group.triangles
+    assert triangle.index == 1
+    np.testing.assert_equal(triangle.normals, model.normals[1])
+    np.testing.assert_equal(
+        [vertex.coords for vertex in triangle.vertices],
+        [[6, 7, 8], [9, 10, 11], [0, 1, 2]]
+    )
+    assert triangle.vertices[-1].bone_weights[0] == 1
+    assert len(group.triangles[1:]) == 0
+
+
+def test_group_optimize_vertex_cache():
+    size = 10
+    quads = [
+        (y * (size + 1) + x, y * (size + 1) + x + 1)
+        for y in range(size) for x in range(size)
+    ]
+    triangle_indices = np.random.RandomState(0).permutation([
+        triangle
+        for a, b in quads
+        for triangle in (
+            [a, b, a + size + 1], [b, b + size + 1, a + size + 1]
+        )
+    ])
+    model = make_model(
+        positions=np.arange(3 * 121, dtype=np.float32).reshape(-1, 3),
+        bone_weights=np.zeros((121, 4), dtype=np.float32),
+        bone_ids=np.zeros((121, 4), dtype=np.int16),
+        triangle_indices=triangle_indices,
+        normals=np.zeros((200, 3, 3), dtype=np.float32),
+        texcoords=np.zeros((200, 3, 2), dtype=np.float32)
+    )
+    group = Group('group', range(200), None, model)
+    corners = group.vertex_buffer[group.index_buffer]
+
+    before, after = group.optimize_vertex_cache()
+
+    assert after < before
+    assert sorted(group.triangle_indices) == list(range(200))
+    np.testing.assert_equal(
+        group.vertex_buffer[group.index_buffer].reshape(200, 9),
+        corners.reshape(200, 9)[group.triangle_indices]
+    )
+
+
+def test_group_vertex_data():
+    model = make_model(
+        normals=np.tile([0, 1, 0], (2, 3, 1)).astype(np.float32),
+        layout=mesh.compact_layout()
+    )
+    group = Group('group', [0, 1], None, model)
+
+    vertex_data = group.vertex_data
+
+    assert vertex_data.nbytes == 4 * 32
+    np.testing.assert_equal(vertex_data['position'], group.vertex_buffer)
+    np.testing.assert_equal(vertex_data['bone_weights'], np.eye(4) * 255)
+    np.testing.assert_allclose(
+        mesh.octahedral_decode(vertex_data['normal']), group.normal_buffer
+    )
+
+
+def test_empty_group():
+    model = make_model(layout=mesh.compact_layout())
+    group = Group('group', [], None, model)
+
+    assert len(group.vertex_indices) == 0
+    assert len(group.index_buffer) == 0
+    assert group.index_buffer.dtype == np.uint16
+    assert group.vertex_buffer.shape == (0, 3)
+    assert group.texcoord_buffer.shape == (0, 2)
+    assert len(group.vertex_data) == 0
+    assert len(group.triangles) == 0
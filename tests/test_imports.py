@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+GRAPHICS_MODULES = ('OpenGL', 'PIL', 'pygame')
+
+
+@pytest.mark.parametrize('module', [
+    'mr_skeltal.destruct',
+    'mr_skeltal.mesh',
+    'mr_skeltal.ms3d',
+    'mr_skeltal.batch',
+    'mr_skeltal.__main__',
+])
+def test_no_graphics_imports(module):
+    # A fresh interpreter, so modules imported by other tests don't count
+    loaded = subprocess.check_output([
+        sys.executable, '-c',
+        'import sys, {}; print(" ".join(sys.modules))'.format(module)
+    ], cwd=ROOT).decode('utf8').split()
+
+    assert not [
+        name for name in loaded if name.split('.')[0] in GRAPHICS_MODULES
+    ]
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from mr_skeltal.ms3d.keyframes import Keyframes, lerp
+
+
+def linear_frame_at_time(times, values, t):
+    """Sample by scanning every keyframe"""
+    t = np.clip(t, 0.0, max(times))
+
+    if t < times[0]:
+        return values[0]
+
+    for i in range(1, len(times)):
+        if times[i - 1] <= t < times[i]:
+            return lerp(
+                values[i - 1], values[i],
+                (t - times[i - 1]) / (times[i] - times[i - 1])
+            )
+
+    return values[-1]
+
+
+@pytest.fixture
+def track():
+    random = np.random.RandomState(0)
+    times = np.cumsum(random.uniform(0.01, 0.1, 200)).astype(np.float32)
+    values = random.normal(size=(200, 3)).astype(np.float32)
+
+    return times, values
+
+
+def test_frame_at_time(track):
+    times, values = track
+    keyframes = Keyframes(times, values)
+
+    # Playing forwards, then jumping around, before and after the track
+    samples = np.concatenate([
+        np.linspace(0, keyframes.max_time, 1000),
+        np.random.RandomState(1).uniform(-1, keyframes.max_time + 1, 200),
+        times,
+    ])
+
+    for t in samples:
+        np.testing.assert_allclose(
+            keyframes.frame_at_time(t),
+            linear_frame_at_time(times, values, t), rtol=1e-5, atol=1e-6
+        )
+
+
+def test_frame_at_times(track):
+    times, values = track
+    keyframes = Keyframes(times, values)
+    samples = np.random.RandomState(2).uniform(
+        -1, keyframes.max_time + 1, (20, 10)
+    )
+
+    sampled = keyframes.frame_at_times(samples)
+    assert sampled.shape == (20, 10, 3)
+
+    np.testing.assert_allclose(
+        sampled.reshape(-1, 3),
+        [linear_frame_at_time(times, values, t) for t in samples.flat],
+        rtol=1e-5, atol=1e-6
+    )
+
+
+def test_single_frame():
+    keyframes = Keyframes([0.0], [(1, 2, 3)])
+
+    np.testing.assert_array_equal(keyframes.frame_at_time(5), [1, 2, 3])
+    np.testing.assert_array_equal(
+        keyframes.frame_at_times([-1, 0, 1]), [[1, 2, 3]] * 3
+    )
@@ -109,3 +109,54 @@ def test_rotation():
             ))),
             1.0
         )
+
+
+def test_quaternions():
+    angles = np.random.RandomState(0).uniform(-np.pi, np.pi, (16, 3))
+    quaternions = matrix.euler_quaternions(angles)
+    rotations = np.array([matrix.rotation(angle) for angle in angles])
+
+    np.testing.assert_allclose(
+        matrix.quaternion_matrices(quaternions), rotations, atol=1e-6
+    )
+    np.testing.assert_allclose(
+        matrix.quaternion_matrices(
+            matrix.quaternion_multiply(quaternions, quaternions[::-1])
+        ),
+        np.matmul(rotations, rotations[::-1]), atol=1e-6
+    )
+
+    vectors = np.random.RandomState(1).normal(size=(16, 3))
+    np.testing.assert_allclose(
+        matrix.quaternion_rotate(quaternions, vectors),
+        np.einsum('nij,nj->ni', rotations[:, :3, :3], vectors), atol=1e-6
+    )
+
+
+def test_batches():
+    random = np.random.RandomState(2)
+    angles = random.uniform(-np.pi, np.pi, (8, 3))
+    offsets = random.normal(size=(8, 3))
+
+    np.testing.assert_allclose(
+        matrix.rotations(angles),
+        [matrix.rotation(angle) for angle in angles], atol=1e-6
+    )
+    np.testing.assert_allclose(
+        matrix.translations(offsets),
+        [matrix.translate(offset) for offset in offsets], atol=1e-6
+    )
+
+
+def test_matrix_quaternions():
+    angles = np.random.RandomState(3).uniform(-np.pi, np.pi, (32, 3))
+    quaternions = matrix.matrix_quaternions(matrix.rotations(angles))
+
+    # Either sign is the same rotation
+    np.testing.assert_allclose(
+        np.abs(np.sum(quaternions * matrix.euler_quaternions(angles), -1)),
+        1, atol=1e-6
+    )
+
+    continuous = matrix.continuous_quaternions(quaternions)
+    assert (np.sum(continuous[1:] * continuous[:-1], -1) >= 0).all()
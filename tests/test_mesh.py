@@ -0,0 +1,107 @@
+import numpy as np
+
+from mr_skeltal import mesh
+
+
+def test_weld():
+    positions = np.array([
+        [0, 0, 0], [1, 0, 0], [0, 1, 0],
+        [0, 1, 0], [1, 0, 0], [1, 1, 0],
+    ], dtype=np.float32)
+    normals = np.array([[0, 0, 1]] * 5 + [[0, 1, 0]], dtype=np.float32)
+
+    corners, indices = mesh.weld(positions, normals)
+
+    np.testing.assert_equal(corners, [0, 1, 2, 5])
+    np.testing.assert_equal(indices, [0, 1, 2, 2, 1, 3])
+    np.testing.assert_equal(positions[corners][indices], positions)
+
+
+def test_weld_compares_all_attributes():
+    positions = np.zeros((3, 3), dtype=np.float32)
+    bone_ids = np.array([[0], [1], [0]], dtype=np.int16)
+
+    corners, indices = mesh.weld(positions, bone_ids)
+
+    np.testing.assert_equal(corners, [0, 1])
+    np.testing.assert_equal(indices, [0, 1, 0])
+
+
+def test_index_buffer():
+    assert mesh.index_buffer(np.arange(10)).dtype == np.uint16
+    assert mesh.index_buffer(np.arange(70000)).dtype == np.uint32
+
+
+def grid(size):
+    """The triangles of a `size` by `size` grid of quads, shuffled"""
+    triangles = []
+    for y in range(size):
+        for x in range(size):
+            a = y * (size + 1) + x
+            b, c = a + 1, a + size + 1
+            triangles += [[a, b, c], [b, c + 1, c]]
+
+    return np.random.RandomState(0).permutation(triangles)
+
+
+def test_acmr():
+    assert mesh.acmr([0, 1, 2, 0, 1, 2]) == 1.5
+    assert mesh.acmr([0, 1, 2, 3, 4, 5], cache_size=2) == 3
+    assert mesh.acmr([]) == 0
+
+
+def test_tipsify():
+    triangles = grid(20)
+    order = mesh.tipsify(triangles, 21 * 21)
+
+    assert sorted(order) == list(range(len(triangles)))
+    assert mesh.acmr(triangles[order]) < 0.8 < mesh.acmr(triangles)
+
+
+def test_octahedral_normals():
+    normals = np.random.RandomState(0).normal(size=(1000, 3))
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    normals[:6] = np.vstack([np.eye(3), -np.eye(3)])
+
+    encoded = mesh.octahedral_encode(normals)
+
+    assert encoded.dtype == np.int16
+    assert encoded.shape == (1000, 2)
+    np.testing.assert_allclose(
+        mesh.octahedral_decode(encoded), normals, atol=1e-3
+    )
+
+
+def test_quantize_weights():
+    weights = np.array([[1 / 3, 1 / 3, 1 / 3, 0], [0.5, 0.5, 0, 0]])
+
+    quantized = mesh.quantize_weights(weights, np.uint8)
+
+    assert quantized.dtype == np.uint8
+    np.testing.assert_equal(quantized.sum(axis=1), [255, 255])
+    np.testing.assert_allclose(quantized / 255, weights, atol=1 / 255)
+
+
+def test_compact_layout():
+    layout = mesh.compact_layout(half_floats=True)
+
+    assert layout.stride == 24
+    assert [layout.offset(attribute.name) for attribute in layout] == [
+        0, 8, 12, 16, 20
+    ]
+
+    buffer = layout.pack(
+        position=[[1, 2, 3]],
+        normal=[[0, 0, -1]],
+        texcoord=[[0.5, 0.25]],
+        bone_ids=[[3, -1, -1, -1]],
+        bone_weights=[[1, 0, 0, 0]]
+    )
+
+    assert buffer.nbytes == 24
+    np.testing.assert_equal(buffer['position'], [[1, 2, 3]])
+    np.testing.assert_allclose(
+        mesh.octahedral_decode(buffer['normal']), [[0, 0, -1]]
+    )
+    np.testing.assert_equal(buffer['bone_ids'], [[3, 255, 255, 255]])
+    np.testing.assert_equal(buffer['bone_weights'], [[255, 0, 0, 0]])
@@ -0,0 +1,88 @@
+import io
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from mr_skeltal.ms3d import MS3DModel, MS3DSpec, gltf
+
+
+def test_model_arrays(model_path):
+    model = MS3DModel(model_path, cache=True)
+    cached = MS3DModel(model_path, cache=True)
+
+    for loaded in (model, cached):
+        assert loaded.triangle_indices.dtype == np.uint16
+        for array in (
+            loaded.positions, loaded.normals, loaded.triangle_indices
+        ):
+            assert array.flags.c_contiguous
+            assert array.flags.aligned
+
+    assert model.groups[0].corner_vertex_indices.dtype == np.intp
+
+
+def test_model_without_vertices(cube_path, tmpdir):
+    spec = MS3DSpec()
+    with open(cube_path, 'rb') as fp:
+        data = spec.deserialize(fp)
+
+    for name in ('vertices', 'triangles', 'vertices_ex'):
+        data[name] = {
+            column: values[:0] for column, values in data[name].items()
+        }
+    data['groups'] = []
+
+    path = str(tmpdir.join('no_vertices.ms3d'))
+    with open(path, 'wb') as fp:
+        spec.serialize(data, fp)
+
+    model = MS3DModel(path)
+
+    assert len(model.positions) == 0
+    assert model.bbox == []
+
+
+@pytest.fixture
+def empty_group_path(model_path):
+    """The test model with an extra group without any triangles"""
+    spec = MS3DSpec()
+    with open(model_path, 'rb') as fp:
+        data = spec.deserialize(fp)
+
+    group = data['groups'][0]
+    data['groups'].append(type(group)(0, 'Empty', [], 0))
+
+    with open(model_path, 'wb') as fp:
+        spec.serialize(data, fp)
+
+    return model_path
+
+
+def test_empty_group_buffers(empty_group_path):
+    group = MS3DModel(empty_group_path).groups[1]
+
+    assert len(group.index_buffer) == 0
+    assert len(group.vertex_data) == 0
+    assert group.vertex_buffer.shape == (0, 3)
+
+
+def test_empty_group_cache(empty_group_path):
+    MS3DModel(empty_group_path, cache=True)
+    model = MS3DModel(empty_group_path, cache=True)
+
+    assert len(model.groups[1].index_buffer) == 0
+
+
+def test_empty_group_gltf(empty_group_path):
+    fp = io.BytesIO()
+    gltf.export(MS3DModel(empty_group_path), fp)
+
+    data = fp.getvalue()
+    json_length, = struct.unpack_from('<I', data, 12)
+    document = json.loads(data[20:20 + json_length].decode('utf8'))
+
+    # A primitive can't be empty, the empty group is left out
+    primitives = document['meshes'][0]['primitives']
+    assert len(primitives) == 1
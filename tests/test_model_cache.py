@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pytest
+
+from mr_skeltal import mesh
+from mr_skeltal.ms3d import MS3DModel, cache
+from mr_skeltal.ms3d import model as ms3d_model
+
+
+def fail_to_parse(monkeypatch):
+    def read_model(model_path):
+        raise AssertionError('the model should load from the cache')
+
+    monkeypatch.setattr(ms3d_model, 'read_model', read_model)
+
+
+def test_write_read(tmpdir):
+    path = str(tmpdir.join('arrays.cache'))
+    layout = mesh.compact_layout()
+    arrays = {
+        'empty': np.zeros((0, 3), dtype=np.float32),
+        'indices': np.arange(10, dtype=np.uint16),
+        'vertices': layout.pack(
+            position=[[1, 2, 3]], normal=[[0, 0, 1]], texcoord=[[0, 0]],
+            bone_ids=[[0, -1, -1, -1]], bone_weights=[[1, 0, 0, 0]]
+        ),
+    }
+
+    cache.write(path, {'answer': 42}, arrays)
+    header, loaded = cache.read(path)
+
+    assert header == {'answer': 42}
+    for name, array in arrays.items():
+        assert loaded[name].dtype == array.dtype
+        assert loaded[name].shape == array.shape
+        assert loaded[name].ctypes.data % cache.ALIGNMENT == 0
+        np.testing.assert_equal(loaded[name], array)
+
+
+def test_model_cache(model_path, monkeypatch):
+    model = MS3DModel(model_path, cache=True)
+    assert os.path.exists(cache.cache_path(model_path))
+
+    fail_to_parse(monkeypatch)
+    cached = MS3DModel(model_path, cache=True)
+
+    assert list(cached.bones) == list(model.bones)
+    assert cached.bones['Bone.001'].parent_bone is cached.bones['Bone']
+    assert cached.groups[0].material.name == model.groups[0].material.name
+    np.testing.assert_equal(cached.positions, model.positions)
+    np.testing.assert_equal(
+        cached.groups[0].vertex_data, model.groups[0].vertex_data
+    )
+    np.testing.assert_equal(
+        cached.groups[0].index_buffer, model.groups[0].index_buffer
+    )
+
+    for timestamp in (0.0, 0.5, 3.25):
+        model.timestamp = cached.timestamp = timestamp
+        np.testing.assert_allclose(
+            cached.bone_matrices, model.bone_matrices, atol=1e-6
+        )
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='needs POSIX permissions')
+def test_cache_permissions(model_path):
+    MS3DModel(model_path, cache=True)
+
+    mode = os.stat(cache.cache_path(model_path)).st_mode & 0o777
+    assert mode == 0o666 & ~cache.umask()
+
+
+def test_model_cache_invalidation(model_path, monkeypatch):
+    MS3DModel(model_path, cache=True)
+
+    # Touching the model keeps the cache, as the contents still match
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.load(model_path, mesh.FLOAT_LAYOUT) is not None
+
+    # Which only needs to be checked once
+    def content_hash(path):
+        raise AssertionError('the model should not be hashed again')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(cache, 'content_hash', content_hash)
+        assert cache.load(model_path, mesh.FLOAT_LAYOUT) is not None
+
+    assert cache.load(model_path, mesh.compact_layout()) is None
+
+    with open(model_path, 'ab') as fp:
+        fp.write(b'\x00')
+    assert cache.load(model_path, mesh.FLOAT_LAYOUT) is None
@@ -0,0 +1,164 @@
+from collections.abc import Mapping
+from io import BytesIO
+import os
+
+import numpy as np
+import pytest
+
+from mr_skeltal import destruct
+from mr_skeltal.ms3d import MS3DSpec
+
+
+spec = MS3DSpec()
+
+
+def as_dicts(value):
+    if isinstance(value, Mapping):
+        return {key: as_dicts(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [as_dicts(item) for item in value]
+
+    return value
+
+
+def test_deserialize(cube_path):
+    with open(cube_path, 'rb') as fp:
+        data = spec.deserialize(fp)
+
+    assert data['version'] == 4
+    assert data['vertices']['vertex'].shape == (122, 3)
+    assert data['triangles']['vertex_normals'].shape == (240, 3, 3)
+    assert data['vertices_ex']['weights'].shape == (122, 3)
+    assert len(data['joints']) == 7
+    assert data['joints'][0]['name'] == 'Bone'
+
+
+def test_index(cube_path):
+    with open(cube_path, 'rb') as fp:
+        sections = spec.index(fp)
+
+    assert sections['signature'] == (0, None)
+    assert sections['vertices'].count == 122
+    assert sections['triangles'].count == 240
+    assert sections['joints'].count == 7
+    assert sections['vertices_ex'].count == 122
+    assert sections['joints_ex'].count == 7
+    assert sections['model_ex'].count is None
+
+
+def test_deserialize_lazy(cube_path):
+    with open(cube_path, 'rb') as fp:
+        data = spec.deserialize(fp)
+
+    with open(cube_path, 'rb') as fp:
+        lazy = spec.deserialize_lazy(fp)
+
+        for name in reversed(list(lazy)):
+            np.testing.assert_equal(
+                as_dicts(lazy[name]), as_dicts(data[name])
+            )
+
+
+def test_serialize_round_trip(cube_path):
+    with open(cube_path, 'rb') as fp:
+        raw = fp.read()
+
+    data = spec.deserialize(BytesIO(raw))
+    assert data['joints_ex']['color'].shape == (7, 3)
+    assert data['model_ex']['alpha_ref'] == 0.5
+
+    fp = BytesIO()
+    spec.serialize(data, fp)
+
+    assert fp.getvalue() == raw
+
+
+def test_serialize_records(cube_path):
+    with open(cube_path, 'rb') as fp:
+        raw = fp.read()
+
+    data = spec.deserialize(BytesIO(raw))
+    for name in ('vertices', 'triangles', 'vertices_ex', 'joints_ex'):
+        columns = data[name]
+        data[name] = [
+            {key: column[i] for key, column in columns.items()}
+            for i in range(len(next(iter(columns.values()))))
+        ]
+
+    fp = BytesIO()
+    spec.serialize(data, fp)
+
+    assert fp.getvalue() == raw
+
+
+def test_serialize_without_extensions(cube_path):
+    with open(cube_path, 'rb') as fp:
+        data = spec.deserialize(fp)
+
+    data['vertices_ex'] = data['joints_ex'] = data['model_ex'] = None
+
+    fp = BytesIO()
+    spec.serialize(data, fp)
+    fp.seek(0)
+
+    data = spec.deserialize(fp)
+    assert data['joints'][0]['name'] == 'Bone'
+    assert data['vertices_ex'] is None
+    assert data['model_ex'] is None
+
+
+def test_stream(cube_path):
+    with open(cube_path, 'rb') as fp:
+        data = spec.deserialize(fp)
+
+    with open(cube_path, 'rb') as fp:
+        vertices = spec.stream(fp, 'vertices', chunk_size=50)
+
+        assert len(vertices) == 122
+        np.testing.assert_almost_equal(
+            [vertex['vertex'] for vertex in vertices],
+            data['vertices']['vertex']
+        )
+
+    with open(cube_path, 'rb') as fp:
+        joints = spec.stream(fp, 'joints', chunk_size=2)
+
+        assert next(joints).name == 'Bone'
+        joints.skip()
+        assert list(joints) == []
+        assert spec.comments.deserialize(fp)['sub_version'] == 1
+
+    with open(cube_path, 'rb') as fp:
+        weights = [
+            vertex['weights'] for vertex in spec.stream(fp, 'vertices_ex')
+        ]
+
+        np.testing.assert_almost_equal(weights, data['vertices_ex']['weights'])
+
+
+def test_deserialize_report(cube_path):
+    report = destruct.Report()
+
+    with open(cube_path, 'rb') as fp:
+        data = spec.deserialize(fp, report)
+
+    assert data['joints'][0]['name'] == 'Bone'
+    assert report['triangles'].count == 240
+    assert report['joints[].keyframes'].count == 7
+    assert report['model_ex'].size == 16
+    assert sum(
+        report[name].size for name in data
+    ) == os.path.getsize(cube_path)
+
+    # The report doesn't change which errors are raised
+    with open(cube_path, 'rb') as fp:
+        truncated = fp.read(21)
+
+    with pytest.raises(destruct.DestructError) as excinfo:
+        spec.deserialize(BytesIO(truncated), destruct.Report())
+
+    with pytest.raises(destruct.DestructError) as expected:
+        spec.deserialize(BytesIO(truncated))
+
+    assert str(excinfo.value) == str(expected.value)
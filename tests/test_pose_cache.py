@@ -0,0 +1,47 @@
+import numpy as np
+
+from mr_skeltal.ms3d import MS3DModel, PoseCache
+
+
+def test_shared_poses(cube_path):
+    cache = PoseCache(quantum=0.1)
+    models = [MS3DModel(cube_path) for _ in range(3)]
+
+    for model in models:
+        model.pose_cache = cache
+        model.timestamp = 1.01
+
+    palettes = [model.bone_matrices for model in models]
+    assert all(palette is palettes[0] for palette in palettes)
+    assert not palettes[0].flags.writeable
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # The pose is evaluated at the quantized time
+    np.testing.assert_allclose(
+        palettes[0], models[0].skeleton.skinning_matrices(1.0), atol=1e-6
+    )
+
+    models[0].timestamp = 1.04
+    assert models[0].bone_matrices is palettes[0]
+    assert cache.hits == 3
+
+
+def test_eviction(cube_path):
+    model = MS3DModel(cube_path)
+    pose_size = len(model.bones) * 4 * 4 * 4
+
+    cache = PoseCache(budget=2 * pose_size, quantum=None)
+    model.pose_cache = cache
+
+    for t in (0.5, 1.0, 0.5, 1.5):
+        model.timestamp = t
+        model.bone_matrices
+
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert len(cache) == 2
+    assert cache.size == 2 * pose_size
+
+    # 1.0 was the least recently used
+    model.timestamp = 1.0
+    model.bone_matrices
+    assert cache.misses == 4
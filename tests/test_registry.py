@@ -0,0 +1,85 @@
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from mr_skeltal import mesh
+from mr_skeltal.ms3d import MS3DModel, ModelRegistry
+
+
+def positions_in_worker(registry, model_path):
+    with registry.acquire(model_path) as model:
+        return model.positions.sum(axis=0).tolist()
+
+
+@pytest.fixture
+def registry(tmpdir):
+    with multiprocessing.Manager() as manager:
+        yield ModelRegistry(manager, str(tmpdir))
+
+
+def test_registry(cube_path, registry):
+    shared = registry.acquire(cube_path)
+    key = shared.key
+    path, references = registry.entries[key]
+    assert references == 1
+
+    expected = MS3DModel(cube_path)
+    np.testing.assert_array_equal(shared.model.positions, expected.positions)
+    assert not shared.model.positions.flags.writeable
+    assert len(shared.model.groups) == len(expected.groups)
+
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(2) as pool:
+        sums = pool.starmap(
+            positions_in_worker, [(registry, cube_path)] * 2
+        )
+
+    assert sums[0] == pytest.approx(expected.positions.sum(axis=0).tolist())
+    # The workers mapped the same file and released their references
+    assert registry.entries[key] == (path, 1)
+
+    shared.release()
+    assert key not in registry
+
+    assert not os.path.exists(path)
+
+
+def test_registry_loads_in_parallel(cube_path, registry):
+    loading, proceed = threading.Event(), threading.Event()
+    loaded = []
+    share = registry.share
+
+    def slow_share(model_path, layout):
+        if layout is mesh.FLOAT_LAYOUT:
+            loading.set()
+            assert proceed.wait(10)
+
+        loaded.append(layout)
+        return share(model_path, layout)
+
+    registry.share = slow_share
+
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        slow = executor.submit(registry.acquire, cube_path)
+        assert loading.wait(10)
+        waiting = executor.submit(registry.acquire, cube_path)
+
+        # Another model loads while the first one is still loading
+        with registry.acquire(cube_path, mesh.compact_layout()) as model:
+            assert len(model.positions) == 122
+        assert not slow.done() and not waiting.done()
+
+        proceed.set()
+        first, second = slow.result(10), waiting.result(10)
+
+    # The second acquirer waited for the first one's file
+    assert loaded.count(mesh.FLOAT_LAYOUT) == 1
+    assert registry.entries[first.key][1] == 2
+
+    first.release()
+    second.release()
+    assert len(registry) == 0
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from mr_skeltal.ms3d import MS3DModel
+from mr_skeltal.ms3d.skeleton import depths
+
+
+def test_depths():
+    # Children before their parents still end up at the right depth
+    parents = np.array([2, -1, 1, 0, -1])
+    np.testing.assert_array_equal(depths(parents), [2, 0, 1, 3, 0])
+
+
+def test_pose(cube_path):
+    model = MS3DModel(cube_path)
+    bones = list(model.bones.values())
+    assert len(model.skeleton.levels) == len(bones)
+
+    for t in np.linspace(0, model.animation_length, 7):
+        model.timestamp = t
+        t = model.timestamp
+
+        np.testing.assert_allclose(
+            model.skeleton.world_matrices(t),
+            [bone.matrix_at_t(t) for bone in bones], atol=1e-5
+        )
+        np.testing.assert_allclose(
+            model.bone_matrices,
+            [
+                np.dot(bone.matrix_at_t(t), bone.inverse_matrix)
+                for bone in bones
+            ], atol=1e-5
+        )
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_bake(cube_path, tmpdir, compact):
+    model = MS3DModel(cube_path)
+    baked = model.bake(compact=compact)
+
+    frames = int(np.ceil(model.animation_length * model.animation_fps)) + 1
+    assert baked.table.shape[:2] == (frames, len(model.bones))
+
+    # On the baked frames the table matches the keyframes
+    t = 40 / model.animation_fps
+    np.testing.assert_allclose(
+        baked.skinning_matrices(t), model.skeleton.skinning_matrices(t),
+        atol=1e-5
+    )
+
+    # Between them it's close to them
+    for t in np.linspace(0, model.animation_length, 31):
+        np.testing.assert_allclose(
+            baked.skinning_matrices(t), model.skeleton.skinning_matrices(t),
+            atol=0.1
+        )
+
+    path = str(tmpdir.join('model.baked'))
+    baked.save(path)
+
+    other = MS3DModel(cube_path)
+    other.load_baked(path)
+    other.timestamp = model.timestamp = 1.3
+    np.testing.assert_array_equal(other.bone_matrices, model.bone_matrices)
+
+
+def test_bake_part(cube_path):
+    model = MS3DModel(cube_path)
+
+    # Ends between two frames, and before the last keyframe
+    baked = model.skeleton.bake(7, 0.95)
+    assert len(baked.table) == 8
+
+    # Every frame is a step of 1 / rate, the last one included
+    for index in range(len(baked.table)):
+        np.testing.assert_allclose(
+            baked.skinning_matrices(index / 7),
+            model.skeleton.skinning_matrices(index / 7),
+            atol=1e-5
+        )